@@ -1,12 +1,67 @@
-from langchain_openai import ChatOpenAI
+import time
 from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableLambda
 from abc import ABC, abstractmethod
+from .llm import get_llm
+from graph.compaction import compact_history
+from graph.events import emit
+from data.schema_summary import schema_summary
+from config.settings import (
+    SCHEMA_SUMMARY_TOKENS, SCHEMA_CACHE_DIR, AGENT_CONTEXT_TOKENS, AGENT_MAX_ITERATIONS, AGENT_MAX_SECONDS
+)
+
+
+def dataset_summary(df, name):
+    """Token-budgeted description of a dataset for a system prompt, cached per dataset version"""
+    return schema_summary(df, name, SCHEMA_SUMMARY_TOKENS, SCHEMA_CACHE_DIR)
+
+
+FINAL_ANSWER_MSG = SystemMessage(content="""You have reached the limit of tool calls for this request.
+Do not call any more tools. Answer now with what you have found so far, and say clearly what you could not check.""")
+
 
 class BaseAgent(ABC):
-    def __init__(self, tool, sys_msg_content, openai_api_key):
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=openai_api_key).bind_tools([tool])
+    # History tokens sent with each call (graph/compaction.py)
+    context_tokens = AGENT_CONTEXT_TOKENS
+    # Tool-calling rounds and seconds per request before the agent must answer without tools
+    # (the agent's tool node also stops waiting on calls once max_seconds is used up)
+    max_iterations = AGENT_MAX_ITERATIONS
+    max_seconds = AGENT_MAX_SECONDS
+
+    def __init__(self, tool, sys_msg_content, openai_api_key, extra_tools=(), data_summary=None):
+        self.tools = [tool, *extra_tools]
+        self.llm = get_llm("gpt-4o", 0, openai_api_key).bind_tools(self.tools)
+        # Same tool definitions (and so the same cached prompt prefix), but tool calls are disabled
+        self.answer_llm = get_llm("gpt-4o", 0, openai_api_key).bind_tools(self.tools, tool_choice="none")
+        # Static instructions first and the dataset summary last, so the prompt prefix stays
+        # byte-identical across calls and data reloads and is served from the provider's prompt cache
+        if data_summary:
+            sys_msg_content = f"{sys_msg_content}\n\nAvailable Data Structure:\n{data_summary}"
         self.sys_msg = SystemMessage(content=sys_msg_content)
 
     @abstractmethod
     def agent(self, state):
-        pass 
\ No newline at end of file
+        pass
+
+    def prepare(self, state):
+        """Model, messages and state update for the next call; tools are disabled once a round or time limit is hit"""
+        messages, compacted = compact_history(state, self.context_tokens)
+        # Model calls so far for this request, i.e. tool-calling rounds completed
+        rounds = state.get("iterations") or 0
+        started_at = state.get("started_at") or time.time()
+        update = {"compacted": compacted, "iterations": rounds + 1, "started_at": started_at}
+        elapsed = time.time() - started_at
+        if rounds >= self.max_iterations or elapsed >= self.max_seconds:
+            emit("limit", agent=type(self).__name__, iterations=rounds, elapsed_ms=round(1000 * elapsed))
+            return self.answer_llm, [self.sys_msg] + messages + [FINAL_ANSWER_MSG], update
+        return self.llm, [self.sys_msg] + messages, update
+
+    async def aagent(self, state):
+        llm, messages, update = self.prepare(state)
+        response = await llm.ainvoke(messages)
+        return {"messages": [response], **update}
+
+    @property
+    def node(self):
+        # Graph node with both implementations: invoke/stream run agent, ainvoke/astream run aagent
+        return RunnableLambda(self.agent, afunc=self.aagent, name=type(self).__name__) 
\ No newline at end of file
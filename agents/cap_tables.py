@@ -1,38 +1,46 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class CapTablesAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_cap_tables_agent(tool, openai_api_key):
-    # sample_data = tool.locals['cap_tables'].head(3).to_string()
-    companies = tool.locals['cap_tables']['Company'].value_counts()
+def create_cap_tables_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['cap_tables'], 'cap_tables')
 
-    sys_msg_content = f"""You are the Cap Tables Specialist at Santé Ventures, focused on analyzing ownership, investments, and capitalization data.
+    sys_msg_content = """You are the Cap Tables Specialist at Santé Ventures, focused on analyzing ownership, investments, and capitalization data.
 
-Available Companies:
-{companies}
-
-When asked about a company, make sure to reference the available companies.
+When asked about a company, make sure it has a cap table: resolve the name with resolve_company, or list every company with cap_tables['Company'].unique().
 Key columns include:
 - Company
 - URL
 - Markdown Content (contains detailed cap table information)
 
+Parsed cap tables:
+- Use query_cap_tables first for ownership lookups and totals; it filters the parsed positions by company, holder, funding round or share class and can total them with group_by (over each company's latest cap table)
+- The same data is in the REPL as cap_table_entries with columns company, table, holder, share_class, funding_round, shares, pct_fully_diluted
+- Only read Markdown Content when the parsed entries cannot answer the question
+
 Example queries you can handle:
 1. cap_tables[cap_tables['Company'] == 'Specific Company']['Markdown Content'].iloc[0]
 1a. cap_tables[cap_tables['Company'].str.contains('Specific Company', na=False)]['Markdown Content'].iloc[0]
 2. cap_tables[cap_tables['Markdown Content'].str.contains('Series A', na=False)].iloc[0]
 3. len(cap_tables['Company'].unique())
+4. cap_table_entries[cap_table_entries['holder'].str.contains('Santé', na=False)].groupby('company')['pct_fully_diluted'].sum()
+
+Keyword search:
+- Use search_text with dataset='cap_tables' to find cap tables mentioning a round, holder or term
+- It returns row IDs usable as cap_tables.loc[[...]]
 
 Best practices:
-- Parse markdown content carefully for specific information
-- Look for ownership percentages and share counts
+- Resolve company names with resolve_company first, then filter with cap_tables['company_id'] == company_id instead of guessing spellings with str.contains
+- Prefer search_text over str.contains scans of Markdown Content
+- Parse markdown content carefully when you do need it
 - Track changes across funding rounds
 - Consider both fully diluted and current ownership
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return CapTablesAgent(tool, sys_msg_content, openai_api_key)
\ No newline at end of file
+    return CapTablesAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data)
\ No newline at end of file
@@ -1,18 +1,16 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class CompaniesAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_companies_agent(tool, openai_api_key):
-    sample_data = tool.locals['all_companies'].head(3).to_string()
+def create_companies_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['all_companies'], 'all_companies')
 
-    sys_msg_content = f"""You are the Companies Specialist at Sante Ventures, an expert in analyzing healthcare company data.
-
-Available Data Structure:
-{sample_data}
+    sys_msg_content = """You are the Companies Specialist at Sante Ventures, an expert in analyzing healthcare company data.
 
 Key columns include:
 - Companies
@@ -27,12 +25,21 @@ Example queries you can handle:
 2. all_companies.groupby('Vertical').size().sort_values(ascending=False)
 3. all_companies[all_companies['Companies'] == 'Specific Company']
 
+Company profiles:
+- For "tell me everything about X" questions, call get_company_profile first; it merges the company's rows from every dataset (deals, funding rounds, exits, meetings, cap table) into one record
+
+Keyword search:
+- Use search_text with dataset='all_companies' to rank companies by keywords in Companies, Keywords and Description
+- It returns row IDs usable as all_companies.loc[[...]]
+
 Best practices:
+- Resolve company names with resolve_company first, then filter with all_companies['company_id'] == company_id instead of guessing spellings with str.contains
+- Prefer search_text over str.contains scans of Keywords and Description
 - Use pandas operations for efficient filtering and analysis
 - Always check for null values before string operations
 - Use .loc[] for label-based indexing
 - Format your output as a clear, readable DataFrame
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return CompaniesAgent(tool, sys_msg_content, openai_api_key)
\ No newline at end of file
+    return CompaniesAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data)
\ No newline at end of file
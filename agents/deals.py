@@ -1,18 +1,16 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class DealsAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_deals_agent(tool, openai_api_key):
-    sample_data = tool.locals['all_deals'].head(3).to_string()
+def create_deals_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['all_deals'], 'all_deals')
 
-    sys_msg_content = f"""You are the Deals Specialist at Sante Ventures, an expert in analyzing healthcare investment deals.
-
-Available Data Structure:
-{sample_data}
+    sys_msg_content = """You are the Deals Specialist at Sante Ventures, an expert in analyzing healthcare investment deals.
 
 Key columns include:
 - Companies
@@ -30,11 +28,12 @@ Example queries you can handle:
 3. all_deals[all_deals['Deal Date'].dt.year == 2023]['Deal Size'].sum()
 
 Best practices:
+- Resolve company names with resolve_company first, then filter with all_deals['company_id'] == company_id instead of guessing spellings with str.contains
 - Use pandas datetime operations for date-based analysis
 - Handle currency values appropriately
 - Group and aggregate data for trend analysis
 - Format monetary values clearly
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return DealsAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return DealsAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data) 
\ No newline at end of file
@@ -1,18 +1,16 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class FundingAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_funding_agent(tool, openai_api_key):
-    sample_data = tool.locals['sante_seen_additional_funding_deals'].head(3).to_string()
+def create_funding_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['sante_seen_additional_funding_deals'], 'sante_seen_additional_funding_deals')
 
-    sys_msg_content = f"""You are the Funding Specialist at Sante Ventures, focused on analyzing our portfolio companies' follow-on funding rounds.
-
-Available Data Structure:
-{sample_data}
+    sys_msg_content = """You are the Funding Specialist at Sante Ventures, focused on analyzing our portfolio companies' follow-on funding rounds.
 
 Key columns include:
 - Company Name
@@ -29,11 +27,12 @@ Example queries you can handle:
 3. sante_seen_additional_funding_deals['Post-Money Valuation'].describe()
 
 Best practices:
+- Resolve company names with resolve_company first, then filter with sante_seen_additional_funding_deals['company_id'] == company_id instead of guessing spellings with str.contains
 - Always handle currency values appropriately (convert strings to numeric)
 - Use date-based filtering for temporal analysis
 - Calculate key metrics like round-to-round multiples
 - Format monetary values in millions/billions for readability
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return FundingAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return FundingAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data) 
\ No newline at end of file
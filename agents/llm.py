@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+from typing import Optional
+import httpx
+from langchain_openai import ChatOpenAI
+from .usage import PROMPT_CACHE_USAGE
+from config.settings import LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_KEEPALIVE_EXPIRY
+
+# HTTP connection pools shared by every chat model: one per process (sync) and per event loop (async)
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def http_client() -> httpx.Client:
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits())
+        return _http_client
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """One async connection pool per event loop; connections bound to a closed loop are never reused"""
+
+    def __init__(self, limits: httpx.Limits):
+        self.limits = limits
+        self.pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+
+    def pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            pool = self.pools.get(loop)
+            if pool is None:
+                pool = self.pools[loop] = httpx.AsyncHTTPTransport(limits=self.limits)
+            return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        with self.lock:
+            pool = self.pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+def http_async_client() -> httpx.AsyncClient:
+    global _http_async_client
+    with _lock:
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(transport=LoopLocalTransport(_limits()))
+        return _http_async_client
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = "gpt-4o", temperature: float = 0, api_key: Optional[str] = None) -> ChatOpenAI:
+    """Process-wide streaming chat model per (model, temperature, key) on the shared connection pools, recording prompt cache usage"""
+    return ChatOpenAI(
+        model=model, temperature=temperature, api_key=api_key, streaming=True, stream_usage=True,
+        http_client=http_client(), http_async_client=http_async_client(), callbacks=[PROMPT_CACHE_USAGE],
+    )
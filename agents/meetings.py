@@ -1,26 +1,16 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class MeetingsAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_meetings_agent(tool, openai_api_key):
-    sample_data = tool.locals['meetings_df'].head(3).to_string()
-    meeting_types = tool.locals['meetings_df']['types'].value_counts()
-    companies = tool.locals['meetings_df']['companies'].value_counts()
+def create_meetings_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['meetings_df'], 'meetings_df')
 
-    sys_msg_content = f"""You are the Meetings Specialist at Sante Ventures, expert in analyzing internal meeting records.
-
-Available Data Structure:
-{sample_data}
-
-Meeting Types:
-{meeting_types}
-
-Companies:
-{companies}
+    sys_msg_content = """You are the Meetings Specialist at Sante Ventures, expert in analyzing internal meeting records.
 
 Key columns include:
 - page_content: Detailed meeting notes
@@ -36,12 +26,20 @@ Example queries you can handle:
 4. meetings_df[meetings_df['types'] == 'MAM' and meetings_df['companies'] == 'Specific Company'].to_markdown()
 5. meetings_df[(meetings_df['types'] == 'LP Meeting') & (meetings_df['date'].between('2024-10-01', '2024-12-31'))].to_markdown()
 
+Finding discussions:
+- For narrow questions about what was said, use search_meeting_passages; it returns only the most relevant passages with their meeting's title, date, companies and type
+- Use search_text with dataset='meetings_df' to find relevant meetings by keyword; it returns ranked row IDs and snippets
+- Then pull only those rows, e.g. meetings_df.loc[[12, 40], ['title', 'date', 'page_content']]
+
 Best practices:
-- Use text search for finding specific discussions
+- The data structure summary lists only the most common types and companies; use meetings_df['types'].value_counts() for all of them
+- Resolve company names with resolve_company first, then filter with meetings_df['company_ids'].apply(lambda ids: company_id in ids) instead of guessing spellings with str.contains
+- Prefer search_meeting_passages or search_text over str.contains scans of page_content
+- Avoid dumping whole page_content bodies with to_markdown(); select only the columns and rows you need
 - Consider case sensitivity in string searches
 - Group meetings by type or company for analysis
 - Handle date ranges appropriately
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return MeetingsAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return MeetingsAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data) 
\ No newline at end of file
@@ -1,18 +1,16 @@
-from .base import BaseAgent
-from langgraph.graph import MessagesState
+from .base import BaseAgent, dataset_summary
+from graph.state import AgentState
 
 class SanteCompaniesAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
 
-def create_sante_companies_agent(tool, openai_api_key):
-    sample_data = tool.locals['sante_seen_all_companies'].head(3).to_string()
+def create_sante_companies_agent(tool, openai_api_key, extra_tools=()):
+    sample_data = dataset_summary(tool.locals['sante_seen_all_companies'], 'sante_seen_all_companies')
 
-    sys_msg_content = f"""You are the Santé Companies Specialist, focused on analyzing all companies that Santé has reviewed or invested in.
-
-Available Data Structure:
-{sample_data}
+    sys_msg_content = """You are the Santé Companies Specialist, focused on analyzing all companies that Santé has reviewed or invested in.
 
 Key columns include:
 - Company Name
@@ -29,11 +27,12 @@ Example queries you can handle:
 3. sante_seen_all_companies.groupby('Investment Status')['Initial Review Date'].agg(['count', 'min', 'max'])
 
 Best practices:
+- Resolve company names with resolve_company first, then filter with sante_seen_all_companies['company_id'] == company_id instead of guessing spellings with str.contains
 - Use boolean masks for complex filtering
 - Analyze investment patterns across sectors
 - Track temporal trends in investment decisions
 - Consider both quantitative and qualitative fields
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return SanteCompaniesAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return SanteCompaniesAgent(tool, sys_msg_content, openai_api_key, extra_tools, sample_data) 
\ No newline at end of file
@@ -1,15 +1,19 @@
 from .base import BaseAgent
-from langgraph.graph import MessagesState
+from graph.state import AgentState
 
 class SearchAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    # One or two searches answer almost every question
+    max_iterations = 3
 
-def create_search_agent(tool, openai_api_key):
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
+
+def create_search_agent(tool, openai_api_key, extra_tools=()):
     sys_msg_content = """You are the Search Specialist at Santé Ventures, expert in finding relevant companies using semantic search.
 
-You have access to a vector database of company descriptions and can find similar companies based on semantic meaning.
+You have access to a vector database of company descriptions and can find similar companies based on semantic meaning. Searches also match exact terms in company names, keywords and descriptions, so drug names, modalities and acronyms can be searched directly.
 
 Example queries you can handle:
 1. "Find companies similar to Teladoc in telehealth"
@@ -17,11 +21,13 @@ Example queries you can handle:
 3. "Find startups developing remote patient monitoring solutions"
 
 Best practices:
+- For "companies similar to X" where X is a named company, use similar_companies first; fall back to search_companies if X has no description on file
 - Focus on key technological or business aspects in search queries
-- Consider multiple relevant keywords
+- Put constraints like vertical, country or date received into the search filters instead of the query text (e.g. "AI diagnostics companies in Germany" -> query "AI diagnostics", country "Germany")
+- Consider multiple relevant keywords; send them together in one search_companies_batch call rather than several search_companies calls
 - Look for both direct and indirect competitors
 - Consider various applications of similar technologies
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return SearchAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return SearchAgent(tool, sys_msg_content, openai_api_key, extra_tools) 
\ No newline at end of file
@@ -1,12 +1,16 @@
 from .base import BaseAgent
-from langgraph.graph import MessagesState
+from graph.state import AgentState
 
 class TavilyAgent(BaseAgent):
-    def agent(self, state: MessagesState):
-        response = self.llm.invoke([self.sys_msg] + state["messages"])
-        return {"messages": [response]}
+    # Each round is a live web search
+    max_iterations = 4
 
-def create_tavily_agent(tool, openai_api_key):
+    def agent(self, state: AgentState):
+        llm, messages, update = self.prepare(state)
+        response = llm.invoke(messages)
+        return {"messages": [response], **update}
+
+def create_tavily_agent(tool, openai_api_key, extra_tools=()):
     sys_msg_content = """You are the Web Research Specialist at Santé Ventures, expert in finding up-to-date information about healthcare companies and markets.
 
 You have access to Tavily's advanced search capabilities to find relevant information from trusted sources on the internet.
@@ -23,6 +27,7 @@ Best practices:
 - Look for market data and competitive intelligence
 - Consider regulatory and compliance aspects
 - Verify information from multiple sources when possible
+- When a topic needs several searches, send the queries together in one web_search_batch call rather than one search at a time
 
 When providing information:
 1. Always cite your sources
@@ -31,6 +36,6 @@ When providing information:
 4. Note any potential biases or limitations
 5. Distinguish between facts and analysis
 
-Only use your assigned tool. If you cannot answer with your tool, say so clearly."""
+Only use your assigned tools. If you cannot answer with your tools, say so clearly."""
 
-    return TavilyAgent(tool, sys_msg_content, openai_api_key) 
\ No newline at end of file
+    return TavilyAgent(tool, sys_msg_content, openai_api_key, extra_tools) 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from graph.events import emit
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheUsage(BaseCallbackHandler):
+    """Cached and uncached prompt tokens per graph node, from each completion's usage metadata"""
+
+    run_inline = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.runs: Dict[UUID, str] = {}
+        self.nodes: Dict[str, Dict[str, int]] = defaultdict(lambda: {'calls': 0, 'input_tokens': 0, 'cached_tokens': 0})
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs: Any) -> None:
+        with self.lock:
+            self.runs[run_id] = (metadata or {}).get('langgraph_node', 'unknown')
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        with self.lock:
+            self.runs.pop(run_id, None)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        with self.lock:
+            node = self.runs.pop(run_id, 'unknown')
+        message = getattr(response.generations[0][0], 'message', None) if response.generations and response.generations[0] else None
+        usage = getattr(message, 'usage_metadata', None)
+        if not usage:
+            return
+        input_tokens = usage.get('input_tokens', 0)
+        cached_tokens = (usage.get('input_token_details') or {}).get('cache_read', 0) or 0
+        with self.lock:
+            totals = self.nodes[node]
+            totals['calls'] += 1
+            totals['input_tokens'] += input_tokens
+            totals['cached_tokens'] += cached_tokens
+        emit("usage", node=node, input_tokens=input_tokens, cached_tokens=cached_tokens,
+             uncached_tokens=input_tokens - cached_tokens)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Totals per node since start: calls, input, cached and uncached tokens, and cache hit rate"""
+        with self.lock:
+            return {
+                node: {
+                    **totals,
+                    'uncached_tokens': totals['input_tokens'] - totals['cached_tokens'],
+                    'cache_hit_rate': totals['cached_tokens'] / totals['input_tokens'] if totals['input_tokens'] else 0.0,
+                }
+                for node, totals in self.nodes.items()
+            }
+
+    def report(self) -> str:
+        return '; '.join(
+            f"{node}: {totals['calls']} calls, {totals['input_tokens']} input tokens, "
+            f"{totals['cached_tokens']} cached ({totals['cache_hit_rate']:.0%})"
+            for node, totals in sorted(self.snapshot().items())
+        ) or 'no LLM calls'
+
+
+class PromptCacheReport(BaseCallbackHandler):
+    """Logs the prompt cache totals whenever a top-level graph run ends"""
+
+    def __init__(self, usage: PromptCacheUsage):
+        self.usage = usage
+
+    def on_chain_end(self, outputs, *, run_id: UUID, parent_run_id: UUID = None, **kwargs: Any) -> None:
+        if parent_run_id is None:
+            logger.info("Prompt cache usage: %s", self.usage.report())
+
+    def on_chain_error(self, error, *, run_id: UUID, parent_run_id: UUID = None, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id, parent_run_id=parent_run_id)
+
+
+# Process-wide recorder shared by every chat model
+PROMPT_CACHE_USAGE = PromptCacheUsage()
@@ -25,6 +25,40 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_INDEX = os.getenv("PINECONE_INDEX")
 PINECONE_ENVIRONMENT = os.getenv("PINECONE_ENVIRONMENT")
 EMBED_MODEL = os.getenv("EMBED_MODEL")
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite")
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "1024"))
+# "pinecone" or "local" (in-process ANN index over all_companies descriptions)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", ".cache/company_index")
+# Incremental Pinecone sync (python -m data.sync)
+SYNC_STATE_PATH = os.getenv("SYNC_STATE_PATH", ".cache/pinecone_sync.sqlite")
+SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "100"))
+SYNC_MAX_CONCURRENCY = int(os.getenv("SYNC_MAX_CONCURRENCY", "4"))
+# Precomputed company neighbours (python -m data.knn_graph)
+KNN_GRAPH_PATH = os.getenv("KNN_GRAPH_PATH", ".cache/company_knn.npz")
+KNN_GRAPH_K = int(os.getenv("KNN_GRAPH_K", "20"))
+
+# Shared HTTP connection pool for LLM calls (per process)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+# Dataset summaries in agent system prompts
+SCHEMA_SUMMARY_TOKENS = int(os.getenv("SCHEMA_SUMMARY_TOKENS", "500"))
+SCHEMA_CACHE_DIR = os.getenv("SCHEMA_CACHE_DIR", ".cache/schema")
+
+# Conversation history sent with each LLM call, in tokens. Tool results before the
+# last COMPACT_KEEP_TURNS turns are cut to COMPACT_TOOL_CHARS characters, and the
+# oldest turns are dropped when the history is still over budget
+SUPERVISOR_CONTEXT_TOKENS = int(os.getenv("SUPERVISOR_CONTEXT_TOKENS", "4000"))
+AGENT_CONTEXT_TOKENS = int(os.getenv("AGENT_CONTEXT_TOKENS", "16000"))
+COMPACT_KEEP_TURNS = int(os.getenv("COMPACT_KEEP_TURNS", "2"))
+COMPACT_TOOL_CHARS = int(os.getenv("COMPACT_TOOL_CHARS", "300"))
+
+# Tool-calling rounds and seconds a specialist may spend on one request before it is made
+# to answer without tools (defaults; some agents set their own in agents/)
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", "6"))
+AGENT_MAX_SECONDS = float(os.getenv("AGENT_MAX_SECONDS", "90"))
 
 # S3 configuration
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
@@ -33,9 +67,26 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET")
 
 # Additional API keys
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+# Web search results are reused for WEB_CACHE_TTL seconds
+WEB_CACHE_PATH = os.getenv("WEB_CACHE_PATH", ".cache/web_search.sqlite")
+WEB_CACHE_TTL = float(os.getenv("WEB_CACHE_TTL", "86400"))
+WEB_CACHE_SIZE = int(os.getenv("WEB_CACHE_SIZE", "256"))
+WEB_SEARCH_CONCURRENCY = int(os.getenv("WEB_SEARCH_CONCURRENCY", "4"))
+# Web page text passed to the LLM per search, in tokens (most relevant passages first)
+WEB_CONTEXT_TOKENS = int(os.getenv("WEB_CONTEXT_TOKENS", "1500"))
 
 # Retriever configuration
+# Company search returns between RETRIEVER_MIN_K and RETRIEVER_K results, keeping
+# those scoring at least RETRIEVER_SCORE_CUTOFF x the best score
 RETRIEVER_K = int(os.getenv("RETRIEVER_K", "15"))
+RETRIEVER_MIN_K = int(os.getenv("RETRIEVER_MIN_K", "3"))
+RETRIEVER_SCORE_CUTOFF = float(os.getenv("RETRIEVER_SCORE_CUTOFF", "0.85"))
+SEARCH_DESCRIPTION_CHARS = int(os.getenv("SEARCH_DESCRIPTION_CHARS", "200"))
+# "hybrid" (BM25 + vector, fused with reciprocal-rank fusion) or "vector"
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
+
+# Tool execution configuration
+TOOL_THREAD_WORKERS = int(os.getenv("TOOL_THREAD_WORKERS", "8"))
 
 # Deal Cloud configuration
 DEALCLOUD_CLIENT_ID = os.getenv("DEALCLOUD_CLIENT_ID")
@@ -0,0 +1,195 @@
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# table numbers a company's cap tables in snapshot order, so its highest table is its latest
+ENTRY_COLUMNS = ['company', 'table', 'holder', 'share_class', 'funding_round', 'shares', 'pct_fully_diluted']
+INDEXED_COLUMNS = ['company', 'holder', 'funding_round', 'share_class']
+
+_HOLDER_HEADER_RE = re.compile(r"holder|stockholder|shareholder|investor|name|owner", re.I)
+_SKIP_HEADER_RE = re.compile(r"%|percent|ownership|price|amount|invest|\$|value|date|cert|note", re.I)
+_TOTAL_RE = re.compile(r"^\W*(grand\s+)?total", re.I)
+# Columns holding a holder's aggregate position rather than one share class
+_AGGREGATE_HEADER_RE = re.compile(r"total|fully[\s-]*diluted|outstanding", re.I)
+_FULLY_DILUTED_RE = re.compile(r"fully[\s-]*diluted", re.I)
+# Text column naming each row's class in long-form tables (holder | class | shares)
+_CLASS_HEADER_RE = re.compile(r"class|series|security|type|round", re.I)
+
+
+def parse_markdown_tables(markdown: str) -> List[pd.DataFrame]:
+    """Parse every pipe table in a markdown document into a DataFrame of strings"""
+    tables, block = [], []
+    for line in str(markdown).splitlines() + ['']:
+        if line.strip().startswith('|'):
+            block.append(line.strip())
+            continue
+        if len(block) >= 2 and re.fullmatch(r"\|?[\s:\-|]+\|?", block[1]):
+            rows = [[cell.strip() for cell in row.strip('|').split('|')] for row in block]
+            header, body = rows[0], [row for row in rows[2:] if any(row)]
+            width = len(header)
+            body = [(row + [''] * width)[:width] for row in body]
+            tables.append(pd.DataFrame(body, columns=_dedupe(header)))
+        block = []
+    return tables
+
+
+def parse_number(value) -> float:
+    """'4,000,000' -> 4000000.0, '(1,200)' -> -1200.0, '' / '-' -> NaN"""
+    text = re.sub(r"[*_$,%\s]", '', str(value))
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    try:
+        number = float(text)
+    except ValueError:
+        return np.nan
+    return -number if negative else number
+
+
+def share_class_round(share_class: str) -> str:
+    """Funding round a share class belongs to, e.g. 'Series A-1 Preferred' -> 'Series A-1'"""
+    lowered = share_class.lower()
+    if 'pre-seed' in lowered or 'preseed' in lowered:
+        return 'Pre-Seed'
+    if 'seed' in lowered:
+        return 'Seed'
+    series = re.search(r"series\s+([a-z0-9]+(?:-\d+)?)", lowered)
+    if series:
+        return f"Series {series.group(1).upper()}"
+    if 'common' in lowered or 'founder' in lowered:
+        return 'Common'
+    if 'option' in lowered or 'pool' in lowered or 'rsu' in lowered:
+        return 'Options'
+    if 'warrant' in lowered:
+        return 'Warrants'
+    if 'safe' in lowered or 'convertible' in lowered or 'note' in lowered:
+        return 'Convertible'
+    return share_class
+
+
+def _clean(value) -> str:
+    return re.sub(r"[*_]", '', str(value)).strip()
+
+
+def _is_text_column(values: pd.Series) -> bool:
+    cells = values.map(_clean)
+    filled = cells[cells != '']
+    return len(filled) > 0 and filled.map(parse_number).isna().mean() > 0.5
+
+
+def normalize_cap_table(company: str, table: pd.DataFrame, table_number: int = 0) -> pd.DataFrame:
+    """Turn one cap table (holder by share class, or holder | class | shares) into long form: one row per (holder, share class)"""
+    columns = list(table.columns)
+    holder_column = next((c for c in columns if _HOLDER_HEADER_RE.search(c)), columns[0])
+    numeric = {c: table[c].map(parse_number) for c in columns if c != holder_column}
+    numeric = {c: values for c, values in numeric.items() if values.notna().any()}
+    class_column = next((
+        c for c in columns
+        if c != holder_column and _CLASS_HEADER_RE.search(c) and _is_text_column(table[c])
+    ), None)
+    share_columns = [
+        c for c in numeric
+        if c != class_column and not _SKIP_HEADER_RE.search(c) and not _AGGREGATE_HEADER_RE.search(c)
+    ]
+    aggregate_columns = [c for c in numeric if _AGGREGATE_HEADER_RE.search(c) and not _SKIP_HEADER_RE.search(c)]
+    # Fully diluted beats a plain total; outstanding share counts leave out options and are not a denominator
+    total_column = next((c for c in aggregate_columns if _FULLY_DILUTED_RE.search(c)),
+                        next((c for c in aggregate_columns if _TOTAL_RE.search(c)), None))
+    if class_column is not None:
+        share_columns = share_columns[:1]
+
+    rows, reported_total = [], np.nan
+    for position, (_, record) in enumerate(table.iterrows()):
+        holder = _clean(record[holder_column])
+        if not holder:
+            continue
+        if _TOTAL_RE.match(holder):
+            # The Total row's fully diluted (or total) figure, else the sum of its class columns
+            if total_column is not None:
+                reported_total = numeric[total_column].iloc[position]
+            else:
+                reported_total = np.nansum([numeric[c].iloc[position] for c in share_columns]) or np.nan
+            continue
+        for column in share_columns:
+            shares = numeric[column].iloc[position]
+            if not np.isnan(shares) and shares != 0:
+                share_class = _clean(record[class_column]) if class_column is not None else _clean(column)
+                share_class = share_class or _clean(column)
+                rows.append((company, table_number, holder, share_class, share_class_round(share_class), shares))
+
+    entries = pd.DataFrame(rows, columns=ENTRY_COLUMNS[:-1])
+    total = reported_total if reported_total and not np.isnan(reported_total) else entries['shares'].sum()
+    entries['pct_fully_diluted'] = entries['shares'] / total * 100 if total else np.nan
+    return entries
+
+
+def extract_cap_table_entries(cap_tables_df: pd.DataFrame) -> pd.DataFrame:
+    """Parse every cap table's Markdown Content into one normalized long-form table"""
+    frames, tables = [], {}
+    for _, row in cap_tables_df.iterrows():
+        for table in parse_markdown_tables(row['Markdown Content']):
+            if len(table.columns) >= 2:
+                number = tables.get(row['Company'], 0)
+                tables[row['Company']] = number + 1
+                frames.append(normalize_cap_table(row['Company'], table, number))
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+class CapTableStore:
+    """Long-form cap table entries with hash indexes on company, holder, funding round and share class"""
+
+    def __init__(self, entries: Optional[pd.DataFrame] = None):
+        self.fit(entries if entries is not None else pd.DataFrame(columns=ENTRY_COLUMNS))
+
+    def fit(self, entries: pd.DataFrame) -> "CapTableStore":
+        entries = entries.reset_index(drop=True)
+        self.indexes: Dict[str, Dict[str, np.ndarray]] = {
+            column: {key: np.asarray(positions) for key, positions in entries.groupby(entries[column].astype(str).str.lower()).indices.items()}
+            for column in INDEXED_COLUMNS
+        }
+        self.latest_table = entries.groupby('company')['table'].max()
+        self.entries = entries
+        return self
+
+    def positions(self, column: str, value: str) -> np.ndarray:
+        """Row positions whose column matches value exactly, else contains it (case-insensitive)"""
+        index = self.indexes[column]
+        key = value.strip().lower()
+        if key in index:
+            return index[key]
+        matches = [positions for name, positions in index.items() if key in name]
+        return np.unique(np.concatenate(matches)) if matches else np.array([], dtype=int)
+
+    def query(self, company: Optional[str] = None, holder: Optional[str] = None,
+              funding_round: Optional[str] = None, share_class: Optional[str] = None,
+              group_by: Optional[List[str]] = None) -> pd.DataFrame:
+        """Matching entries; with group_by, shares and % fully diluted totalled over each company's latest table"""
+        selected = None
+        for column, value in zip(INDEXED_COLUMNS, (company, holder, funding_round, share_class)):
+            if value:
+                positions = self.positions(column, value)
+                selected = positions if selected is None else np.intersect1d(selected, positions)
+        entries = self.entries if selected is None else self.entries.iloc[selected]
+        if group_by:
+            # Percentages are relative to their own table, so summing across tables would double count holders
+            entries = entries[entries['table'] == entries['company'].map(self.latest_table)]
+            return entries.groupby(group_by, sort=False)[['shares', 'pct_fully_diluted']].sum().reset_index()
+        return entries
+
+
+def build_cap_table_store(cap_table_entries: pd.DataFrame) -> CapTableStore:
+    """Build the cap table store"""
+    return CapTableStore(cap_table_entries)
+
+
+def _dedupe(header: List[str]) -> List[str]:
+    seen = {}
+    columns = []
+    for name in header:
+        name = name or 'column'
+        seen[name] = seen.get(name, 0) + 1
+        columns.append(name if seen[name] == 1 else f"{name} {seen[name]}")
+    return columns
@@ -0,0 +1,95 @@
+import json
+import os
+from typing import Optional, Tuple
+import numpy as np
+
+# Files making up a store directory; meta.json is written last and marks it complete
+STORE_FILES = {'codes': 'codes.npy', 'scales': 'scales.npy', 'vectors': 'vectors.npy'}
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: vectors ~= codes * scales[:, None]"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    # Write then rename, so processes still mapping the old file keep a valid view
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+class EmbeddingStore:
+    """Memory-mapped company embeddings (int8 codes to score, float16 rows to rescore) shared by every process on the host"""
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray, vectors: np.ndarray, fingerprint: str = ''):
+        self.codes = codes
+        self.scales = scales
+        self.vectors = vectors
+        self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1] if self.codes.ndim == 2 else 0
+
+    @classmethod
+    def write(cls, path: str, vectors: np.ndarray, fingerprint: str = '') -> "EmbeddingStore":
+        """Persist vectors (unit-normalized, in document order) and reopen them memory-mapped"""
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes, scales = quantize(vectors)
+        arrays = {'codes': codes, 'scales': scales, 'vectors': vectors.astype(np.float16)}
+        for name, array in arrays.items():
+            _save_array(os.path.join(path, STORE_FILES[name]), array)
+        with open(meta_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'count': len(vectors), 'dim': int(vectors.shape[1]) if vectors.ndim == 2 else 0}, f)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> Optional["EmbeddingStore"]:
+        """Memory-map a store written by write(); None if it is missing or incomplete"""
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, file), mmap_mode='r') for name, file in STORE_FILES.items()}
+        return cls(fingerprint=meta.get('fingerprint', ''), **arrays)
+
+    def extend(self, vectors: np.ndarray) -> "EmbeddingStore":
+        """In-memory store with rows appended (the files on disk are left as they are)"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        codes, scales = quantize(vectors)
+        return EmbeddingStore(
+            np.concatenate([self.codes, codes]), np.concatenate([self.scales, scales]),
+            np.concatenate([self.vectors, vectors.astype(np.float16)]), self.fingerprint,
+        )
+
+    def approximate_scores(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        return (self.codes[candidates].astype(np.float32) @ query) * self.scales[candidates]
+
+    def top_k(self, query: np.ndarray, candidates: np.ndarray, k: int, rescore_factor: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k candidates: rank on int8 codes, then rescore the best k x rescore_factor from the float16 copy"""
+        query = np.asarray(query, dtype=np.float32)
+        if not len(candidates) or k <= 0:
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+        approximate = self.approximate_scores(query, candidates)
+        shortlist = min(len(candidates), k * rescore_factor)
+        shortlist = candidates[np.argpartition(-approximate, shortlist - 1)[:shortlist]]
+        shortlist = np.sort(shortlist)  # sequential reads from the float16 map
+        scores = self.vectors[shortlist].astype(np.float32) @ query
+        k = min(k, len(shortlist))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return shortlist[top], scores[top]
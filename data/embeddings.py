@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text: case- and whitespace-insensitive"""
+    return ' '.join(str(text).lower().split())
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings cached in an in-process LRU and an on-disk SQLite store, keyed by model and normalized text"""
+
+    def __init__(self, embeddings: Embeddings, model: str, path: Optional[str] = None, max_size: int = 1024):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_size = max_size
+        self.lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self.db.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model}\0{normalize_text(text)}".encode()).hexdigest()
+
+    def lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key in self.lru:
+                    self.lru.move_to_end(key)
+                    found[key] = self.lru[key]
+            missing = [key for key in keys if key not in found]
+            if self.db is not None and missing:
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    rows = self.db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                        self._remember(key, found[key])
+        return found
+
+    def store(self, vectors: Dict[str, List[float]]) -> None:
+        with self.lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            if self.db is not None and vectors:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()],
+                )
+                self.db.commit()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self.lru[key] = vector
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_size:
+            self.lru.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.key(text)
+        cached = self.lookup([key])
+        if key in cached:
+            return cached[key]
+        vector = self.embeddings.embed_query(text)
+        self.store({key: vector})
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in texts]
+        cached = self.lookup(keys)
+        missing = list(dict.fromkeys(k for k in keys if k not in cached))
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            vectors = self.embeddings.embed_documents([text_by_key[key] for key in missing])
+            fresh = dict(zip(missing, vectors))
+            self.store(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self.key(text)
+        cached = await asyncio.to_thread(self.lookup, [key])
+        if key in cached:
+            return cached[key]
+        vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.store, {key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in texts]
+        cached = await asyncio.to_thread(self.lookup, keys)
+        missing = list(dict.fromkeys(k for k in keys if k not in cached))
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            vectors = await self.embeddings.aembed_documents([text_by_key[key] for key in missing])
+            fresh = dict(zip(missing, vectors))
+            await asyncio.to_thread(self.store, fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
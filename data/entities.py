@@ -0,0 +1,188 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+# Company name column per dataset; the first column present is used
+COMPANY_NAME_COLUMNS = {
+    'all_companies': ['Companies'],
+    'all_deals': ['Companies', 'Company', 'Company Name'],
+    'sante_seen_additional_funding_deals': ['Companies', 'Company', 'Company Name'],
+    'sante_seen_all_companies': ['Companies', 'Company', 'Company Name'],
+    'sante_seen_exit_deals': ['Companies', 'Company', 'Company Name'],
+    'meetings_df': ['companies'],
+    'cap_tables_df': ['Company'],
+    'cap_table_entries': ['company'],
+}
+# Datasets whose name column lists several companies per row
+MULTI_COMPANY_DATASETS = {'meetings_df'}
+
+LEGAL_SUFFIXES = frozenset(
+    "inc incorporated llc ltd limited corp corporation co company gmbh ag sa sas bv nv plc lp llp pty oy ab as spa srl".split()
+)
+
+
+def normalize_company_name(name) -> str:
+    """'Acme Health, Inc.' -> 'acme health'; accents, punctuation and legal suffixes are dropped"""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode().lower()
+    text = re.sub(r"&", ' and ', text)
+    tokens = re.sub(r"[^a-z0-9]+", ' ', text).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def split_meeting_companies(value) -> List[str]:
+    """meetings_df['companies'] holds a flattened list like "Acme', 'Beta" after loading"""
+    if pd.isna(value):
+        return []
+    return [name.strip(" '\"") for name in str(value).split("', '") if name.strip(" '\"") not in ('', 'nan')]
+
+
+def company_names(df: pd.DataFrame, dataset: str) -> Optional[pd.Series]:
+    """Series of name lists (one list per row) for a dataset, or None if it has no name column"""
+    column = next((c for c in COMPANY_NAME_COLUMNS.get(dataset, []) if c in df.columns), None)
+    if column is None:
+        return None
+    if dataset in MULTI_COMPANY_DATASETS:
+        return df[column].map(split_meeting_companies)
+    return df[column].map(lambda name: [] if pd.isna(name) or not str(name).strip() else [str(name).strip()])
+
+
+def _trigrams(key: str) -> set:
+    compact = f"  {key.replace(' ', '')} "
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+
+def _similarity(a: str, b: str) -> int:
+    return max(fuzz.ratio(a.replace(' ', ''), b.replace(' ', '')), fuzz.token_sort_ratio(a, b))
+
+
+class EntityIndex:
+    """Canonical company IDs across all datasets: trigram-blocked fuzzy matching merged with union-find"""
+
+    def __init__(self, threshold: int = 90, max_block_size: int = 500):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.fit({})
+
+    def fit(self, dataframes: Dict[str, pd.DataFrame]) -> "EntityIndex":
+        spellings = defaultdict(Counter)   # normalized key -> raw spelling counts
+        rows = defaultdict(Counter)        # normalized key -> rows per dataset
+        preferred = set()                  # keys present in all_companies
+        for dataset, df in dataframes.items():
+            names = company_names(df, dataset)
+            if names is None:
+                continue
+            for row_names in names:
+                for name in row_names:
+                    key = normalize_company_name(name)
+                    if not key:
+                        continue
+                    spellings[key][name] += 1
+                    rows[key][dataset] += 1
+                    if dataset == 'all_companies':
+                        preferred.add(key)
+
+        keys = sorted(spellings, key=lambda k: (k not in preferred, -sum(rows[k].values()), k))
+        parent = {key: key for key in keys}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        grams_of = {key: _trigrams(key) for key in keys}
+        blocks = defaultdict(list)
+        for key in keys:
+            grams = grams_of[key]
+            candidates = Counter()
+            for gram in grams:
+                block = blocks[gram]
+                if len(block) < self.max_block_size:
+                    candidates.update(block)
+            shared = [gram for gram in grams if blocks[gram]]
+            if not candidates and shared:
+                # Shares only common trigrams ("health", "therapeutics"): block on the rarest one,
+                # capped to its first (preferred) keys
+                rarest = min(shared, key=lambda gram: len(blocks[gram]))
+                candidates = Counter({other: len(grams & grams_of[other]) for other in blocks[rarest][:self.max_block_size]})
+            for other, shared in candidates.most_common(50):
+                if 2 * shared / (len(grams) + len(grams_of[other])) < 0.5:
+                    continue
+                if find(other) != find(key) and _similarity(key, other) >= self.threshold:
+                    # Keep the earlier (preferred / more frequent) key as the cluster root
+                    parent[find(key)] = find(other)
+            for gram in grams:
+                blocks[gram].append(key)
+
+        clusters = defaultdict(list)
+        for key in keys:
+            clusters[find(key)].append(key)
+
+        self.key_to_id = {}
+        self.entities = {}
+        for root, members in clusters.items():
+            company_id = root.replace(' ', '-')
+            name = spellings[root].most_common(1)[0][0]
+            for key in members:
+                self.key_to_id[key] = company_id
+            self.entities[company_id] = {
+                'name': name,
+                'aliases': sorted({s for key in members for s in spellings[key]}),
+                'rows': dict(sum((rows[key] for key in members), Counter())),
+            }
+        self.blocks = {gram: [self.key_to_id[k] for k in block] for gram, block in blocks.items()}
+        return self
+
+    def company_id(self, name) -> Optional[str]:
+        """Canonical ID for a spelling seen at load time (exact after normalization)"""
+        return self.key_to_id.get(normalize_company_name(name))
+
+    def resolve(self, name: str, limit: int = 5) -> List[Tuple[str, int]]:
+        """Best (company_id, score) matches for any spelling, exact matches scoring 100"""
+        key = normalize_company_name(name)
+        if key in self.key_to_id:
+            return [(self.key_to_id[key], 100)]
+        grams = _trigrams(key)
+        candidates = Counter()
+        for gram in grams:
+            block = self.blocks.get(gram, ())
+            if len(block) < self.max_block_size:
+                candidates.update(set(block))
+        known = [gram for gram in grams if self.blocks.get(gram)]
+        if not candidates and known:
+            rarest = min(known, key=lambda gram: len(self.blocks[gram]))
+            candidates.update(set(self.blocks[rarest][:self.max_block_size]))
+        scored = {}
+        for company_id, _ in candidates.most_common(200):
+            entity = self.entities[company_id]
+            score = max(_similarity(key, normalize_company_name(alias)) for alias in entity['aliases'])
+            if key and any(key in normalize_company_name(alias) for alias in entity['aliases']):
+                score = max(score, 80)
+            scored[company_id] = score
+        ranked = sorted(scored.items(), key=lambda item: item[1], reverse=True)
+        return [match for match in ranked[:limit] if match[1] >= 60]
+
+    def assign(self, dataframes: Dict[str, pd.DataFrame]) -> None:
+        """Replace every dataset in dataframes with a copy tagged with company_id (company_ids for multi-company rows)"""
+        for dataset, df in list(dataframes.items()):
+            names = company_names(df, dataset)
+            if names is None:
+                continue
+            ids = names.map(lambda row_names: [self.company_id(name) for name in row_names])
+            if dataset in MULTI_COMPANY_DATASETS:
+                dataframes[dataset] = df.assign(company_ids=ids)
+            else:
+                dataframes[dataset] = df.assign(company_id=ids.map(lambda row_ids: row_ids[0] if row_ids else None))
+
+
+def build_entity_index(dataframes: Dict[str, pd.DataFrame]) -> EntityIndex:
+    """Build the entity index and tag every row with its company ID"""
+    index = EntityIndex()
+    index.fit(dataframes)
+    index.assign(dataframes)
+    return index
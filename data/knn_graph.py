@@ -0,0 +1,111 @@
+import hashlib
+import os
+import warnings
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from langchain_core.embeddings import Embeddings
+from data.vector_index import company_documents, normalize_rows
+
+
+class KNNGraph:
+    """Precomputed cosine nearest neighbours of every company (int32 positions, float16 scores)"""
+
+    def __init__(self, k: int = 20, max_block_mb: int = 64):
+        self.k = k
+        self.max_block_mb = max_block_mb
+        self.neighbors = np.zeros((0, 0), dtype=np.int32)
+        self.scores = np.zeros((0, 0), dtype=np.float16)
+        self.row_ids = np.zeros(0, dtype=np.int64)
+        self.fingerprint = ''
+        self.positions = {}
+
+    def fit(self, vectors: np.ndarray, row_ids: Sequence, fingerprint: str = '') -> "KNNGraph":
+        vectors = normalize_rows(vectors)
+        n = len(vectors)
+        k = min(self.k, max(n - 1, 0))
+        neighbors = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float16)
+        # Rows per block so one float32 block of similarities stays within max_block_mb
+        block_size = max(1, (self.max_block_mb << 20) // (4 * max(n, 1)))
+        for start in range(0, n if k else 0, block_size):
+            # Negated similarities, computed and updated in place (no second block-sized copy)
+            block = np.matmul(vectors[start:start + block_size], vectors.T)
+            np.negative(block, out=block)
+            block[np.arange(len(block)), np.arange(start, start + len(block))] = np.inf
+            top = np.argpartition(block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(top_scores, axis=1, kind='stable')
+            neighbors[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            scores[start:start + len(block)] = -np.take_along_axis(top_scores, order, axis=1)
+        return self._set(neighbors, scores, np.asarray(row_ids), fingerprint)
+
+    def _set(self, neighbors: np.ndarray, scores: np.ndarray, row_ids: np.ndarray, fingerprint: str) -> "KNNGraph":
+        self.neighbors, self.scores, self.row_ids, self.fingerprint = neighbors, scores, row_ids, fingerprint
+        self.positions = {row_id: i for i, row_id in enumerate(row_ids.tolist())}
+        return self
+
+    def __contains__(self, row_id) -> bool:
+        return row_id in self.positions
+
+    def neighbours(self, row_id, k: int = 10) -> List[Tuple[object, float]]:
+        """(row_id, cosine similarity) of the k most similar companies, best first"""
+        position = self.positions.get(row_id)
+        if position is None:
+            return []
+        return [(self.row_ids[p].item(), float(s)) for p, s in zip(self.neighbors[position, :k], self.scores[position, :k])]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(path, neighbors=self.neighbors, scores=self.scores, row_ids=self.row_ids, fingerprint=np.array(self.fingerprint))
+
+    def load(self, path: str) -> "KNNGraph":
+        with np.load(path) as data:
+            return self._set(data['neighbors'], data['scores'], data['row_ids'], str(data['fingerprint']))
+
+
+def graph_fingerprint(texts: Sequence[str], metadatas: Sequence[dict], model: str, k: int) -> str:
+    """Hash of the graph's inputs, including each node's row_id and company name, so shifted rows make it stale"""
+    nodes = [f"{m['row_id']}\0{m.get('Companies', '')}\0{text}" for text, m in zip(texts, metadatas)]
+    return hashlib.sha1('\0'.join([model, str(k), *nodes]).encode()).hexdigest()
+
+
+def load_similarity_graph(all_companies: pd.DataFrame, path: Optional[str], text_key: str = 'Description',
+                          model: str = '', k: int = 20) -> KNNGraph:
+    """Load the saved graph; left empty if it is missing or was built from other rows or texts"""
+    graph = KNNGraph(k=k)
+    texts, metadatas = company_documents(all_companies, text_key)
+    fingerprint = graph_fingerprint(texts, metadatas, model, graph.k)
+    if path and os.path.exists(path) and graph.load(path).fingerprint == fingerprint:
+        return graph
+    warnings.warn(f"Company similarity graph {path} is missing or stale; rebuild it with python -m data.knn_graph")
+    return graph._set(np.zeros((0, 0), dtype=np.int32), np.zeros((0, 0), dtype=np.float16), np.zeros(0, dtype=np.int64), '')
+
+
+def build_similarity_graph(all_companies: pd.DataFrame, embeddings: Embeddings, path: Optional[str] = None,
+                           text_key: str = 'Description', model: str = '', k: int = 20) -> KNNGraph:
+    """Offline build of the company kNN graph (python -m data.knn_graph); skipped while the saved graph is current"""
+    graph = KNNGraph(k=k)
+    texts, metadatas = company_documents(all_companies, text_key)
+    fingerprint = graph_fingerprint(texts, metadatas, model, graph.k)
+    if path and os.path.exists(path) and graph.load(path).fingerprint == fingerprint:
+        return graph
+    graph.fit(np.asarray(embeddings.embed_documents(texts), dtype=np.float32), [m['row_id'] for m in metadatas], fingerprint)
+    if path:
+        graph.save(path)
+    return graph
+
+
+if __name__ == "__main__":
+    from langchain_community.embeddings import OpenAIEmbeddings
+    from config.settings import (
+        S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, OPENAI_API_KEY,
+        EMBED_MODEL, EMBED_CACHE_PATH, KNN_GRAPH_PATH, KNN_GRAPH_K
+    )
+    from data.embeddings import CachedEmbeddings
+    from data.loaders import read_latest_csv_from_s3
+
+    all_companies, latest_file = read_latest_csv_from_s3(S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, 'all_companies/')
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBED_MODEL, api_key=OPENAI_API_KEY), model=EMBED_MODEL, path=EMBED_CACHE_PATH)
+    graph = build_similarity_graph(all_companies, embeddings, KNN_GRAPH_PATH, model=EMBED_MODEL, k=KNN_GRAPH_K)
+    print(f"Built {KNN_GRAPH_PATH} from {latest_file['Key']}: {len(graph.row_ids)} companies x {graph.neighbors.shape[1]} neighbours")
@@ -1,6 +1,12 @@
 import boto3
 from io import StringIO
 import pandas as pd
+from data.text_index import build_text_indexes
+from data.passages import build_passage_index
+from data.cap_tables import extract_cap_table_entries, build_cap_table_store
+from data.entities import build_entity_index
+from data.profiles import build_profile_store
+from data.knn_graph import load_similarity_graph
 
 def read_latest_csv_from_s3(bucket_name, access_key, secret_key, path='data/'):
     s3 = boto3.client('s3', aws_access_key_id=access_key, aws_secret_access_key=secret_key)
@@ -26,10 +32,12 @@ def load_all_dataframes(bucket_name, aws_access_key_id, aws_secret_access_key):
     # Preprocess DataFrames
     meetings_df['companies'] = meetings_df['companies'].apply(lambda x: x.lstrip("['").rstrip("']"))
     meetings_df['types'] = meetings_df['types'].apply(lambda x: x.lstrip("['").rstrip("']").replace("'", ""))
-    meetings_df = meetings_df[['page_content', 'title', 'companies', 'types', 'date']]
+    meetings_df = meetings_df[['page_content', 'title', 'companies', 'types', 'date']].copy()
 
     cap_tables_df['Company'] = cap_tables_df['Filename'].apply(lambda x: ' '.join(x.split('.')[0].split(' ')[1:-2]))
-    cap_tables_df = cap_tables_df[['Company', 'URL', 'Markdown Content']]
+    cap_tables_df = cap_tables_df[['Company', 'URL', 'Markdown Content']].copy()
+    # Parse the markdown cap tables once per snapshot into long form
+    cap_table_entries = extract_cap_table_entries(cap_tables_df)
 
     return {
         'all_companies': all_companies,
@@ -38,5 +46,21 @@ def load_all_dataframes(bucket_name, aws_access_key_id, aws_secret_access_key):
         'sante_seen_all_companies': sante_seen_all_companies,
         'sante_seen_exit_deals': sante_seen_exit_deals,
         'meetings_df': meetings_df,
-        'cap_tables_df': cap_tables_df
-    } 
\ No newline at end of file
+        'cap_tables_df': cap_tables_df,
+        'cap_table_entries': cap_table_entries
+    }
+
+def build_indexes(dataframes, embeddings=None, knn_graph_path=None, embed_model='', knn_graph_k=20):
+    # Build the in-memory search indexes for a snapshot
+    indexes = {}
+    # Entity resolution runs first: it tags every row with its canonical company_id
+    indexes['entities'] = build_entity_index(dataframes)
+    indexes['text'] = build_text_indexes(dataframes)
+    indexes['cap_tables'] = build_cap_table_store(dataframes['cap_table_entries'])
+    indexes['meeting_passages'] = build_passage_index(dataframes['meetings_df'], embeddings)
+    indexes['profiles'] = build_profile_store(dataframes, indexes['entities'])
+    # Company neighbours are precomputed offline (python -m data.knn_graph); here they are only loaded
+    if knn_graph_path:
+        indexes['similar_companies'] = load_similarity_graph(
+            dataframes['all_companies'], knn_graph_path, model=embed_model, k=knn_graph_k)
+    return indexes
@@ -0,0 +1,110 @@
+import re
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from data.text_index import BM25Index, reciprocal_rank_fusion
+
+PASSAGE_COLUMNS = ['meeting_id', 'title', 'date', 'companies', 'types', 'passage']
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_passages(text: str, max_chars: int = 800) -> List[str]:
+    """Meeting notes as passages of roughly max_chars, packing whole paragraphs (or sentences)"""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", str(text)):
+        paragraph = ' '.join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(s for s in _SENTENCE_RE.split(paragraph) if s)
+
+    passages, current = [], ''
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > max_chars:
+            passages.append(current)
+            current = ''
+        while len(piece) > max_chars:
+            passages.append(piece[:max_chars])
+            piece = piece[max_chars:]
+        current = f"{current} {piece}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+def build_meeting_passages(meetings_df: pd.DataFrame, max_chars: int = 800) -> pd.DataFrame:
+    """One row per passage, carrying the metadata of the meeting it came from"""
+    rows = []
+    for meeting_id, meeting in meetings_df.iterrows():
+        for passage in split_passages(meeting['page_content'], max_chars):
+            rows.append((meeting_id, meeting['title'], meeting['date'], meeting['companies'], meeting['types'], passage))
+    return pd.DataFrame(rows, columns=PASSAGE_COLUMNS)
+
+
+class PassageIndex:
+    """Hybrid index over meeting passages: BM25, plus embeddings fused with RRF when a model is supplied"""
+
+    def __init__(self, embeddings=None, batch_size: int = 256):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.keyword_index = BM25Index()
+        self.fit(pd.DataFrame(columns=PASSAGE_COLUMNS))
+
+    def fit(self, passages: pd.DataFrame) -> "PassageIndex":
+        passages = passages.reset_index(drop=True)
+        self.keyword_index.fit(passages.index, (passages['title'].fillna('').astype(str) + '\n' + passages['passage']).tolist())
+        vectors = None
+        if self.embeddings is not None and len(passages):
+            texts = passages['passage'].tolist()
+            vectors = []
+            for start in range(0, len(texts), self.batch_size):
+                vectors.extend(self.embeddings.embed_documents(texts[start:start + self.batch_size]))
+            vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        self.passages = passages
+        self.vectors = vectors
+        return self
+
+    def search(self, query: str, k: int = 5, company: Optional[str] = None, meeting_type: Optional[str] = None) -> pd.DataFrame:
+        """Top-k passages for the query, optionally restricted to a company or meeting type"""
+        passages = self.passages
+        mask = np.ones(len(passages), dtype=bool)
+        if company:
+            mask &= passages['companies'].astype(str).str.contains(company, case=False, regex=False).to_numpy()
+        if meeting_type:
+            mask &= passages['types'].astype(str).str.contains(meeting_type, case=False, regex=False).to_numpy()
+        if not mask.any():
+            return passages.iloc[:0]
+
+        keyword_scores = self.keyword_index.score(query)
+        keyword_scores[~mask] = 0
+        rankings = [_top(keyword_scores, k * 4, positive_only=True)]
+        if self.vectors is not None:
+            query_vector = _normalize(np.asarray(self.embeddings.embed_query(query), dtype=np.float32))
+            vector_scores = self.vectors @ query_vector
+            vector_scores[~mask] = -np.inf
+            rankings.append(_top(vector_scores, k * 4))
+
+        fused = reciprocal_rank_fusion(rankings)[:k]
+        result = passages.loc[[pos for pos, _ in fused]].copy()
+        result['score'] = [score for _, score in fused]
+        return result
+
+
+def _top(scores: np.ndarray, k: int, positive_only: bool = False) -> List[int]:
+    candidates = np.flatnonzero(scores > 0) if positive_only else np.flatnonzero(np.isfinite(scores))
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.argsort(-scores[candidates], kind='stable')].tolist()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def build_passage_index(meetings_df: pd.DataFrame, embeddings=None) -> PassageIndex:
+    """Build the meeting passage index"""
+    return PassageIndex(embeddings).fit(build_meeting_passages(meetings_df))
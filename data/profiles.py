@@ -0,0 +1,114 @@
+from typing import Dict, List, Optional
+import pandas as pd
+from data.entities import EntityIndex
+
+# Profile section per dataset, with how many rows to keep (most recent first)
+PROFILE_SECTIONS = {
+    'all_companies': ('company', 1),
+    'sante_seen_all_companies': ('sante_review', 1),
+    'all_deals': ('deals', 5),
+    'sante_seen_additional_funding_deals': ('latest_rounds', 5),
+    'sante_seen_exit_deals': ('exits', 3),
+    'meetings_df': ('recent_meetings', 5),
+    'cap_table_entries': ('cap_table', 10),
+}
+MAX_FIELDS = 15
+MAX_TEXT = 160
+# Datasets whose sections keep only these fields
+SECTION_FIELDS = {
+    'meetings_df': ['title', 'date', 'types'],
+    'cap_table_entries': ['holder', 'share_class', 'funding_round', 'shares', 'pct_fully_diluted'],
+}
+
+
+def _date_column(df: pd.DataFrame) -> Optional[str]:
+    return next((c for c in df.columns if 'date' in c.lower()), None)
+
+
+def compact_row(row: pd.Series, fields: Optional[List[str]] = None) -> Dict:
+    """Non-null fields of a row with long text truncated, skipping internal ID columns"""
+    record = {}
+    for field, value in row.items():
+        if fields and field not in fields:
+            continue
+        if field in ('company_id', 'company_ids') or not isinstance(value, (list, tuple)) and pd.isna(value):
+            continue
+        if isinstance(value, str) and len(value) > MAX_TEXT:
+            value = value[:MAX_TEXT].rstrip() + '...'
+        record[field] = value
+        if len(record) >= MAX_FIELDS:
+            break
+    return record
+
+
+def _rows_by_company(df: pd.DataFrame, dataset: str) -> Dict[str, pd.DataFrame]:
+    if 'company_ids' in df.columns:
+        df = df.explode('company_ids').rename(columns={'company_ids': 'company_id'})
+    if 'company_id' not in df.columns:
+        return {}
+    date_column = _date_column(df)
+    if date_column:
+        df = df.assign(_sort_date=pd.to_datetime(df[date_column], errors='coerce')).sort_values('_sort_date', ascending=False).drop(columns='_sort_date')
+    elif dataset == 'cap_table_entries':
+        # Latest cap table first
+        df = df.sort_values(['table', 'pct_fully_diluted'], ascending=False)
+    return {company_id: rows for company_id, rows in df.groupby('company_id', sort=False)}
+
+
+class CompanyProfileStore:
+    """One compact record per canonical company, merged from every dataset and keyed by company_id"""
+
+    def __init__(self):
+        self.profiles: Dict[str, Dict] = {}
+        self.entities: Optional[EntityIndex] = None
+
+    def fit(self, dataframes: Dict[str, pd.DataFrame], entities: EntityIndex) -> "CompanyProfileStore":
+        profiles = {
+            company_id: {'company_id': company_id, 'name': entity['name'], 'aliases': entity['aliases']}
+            for company_id, entity in entities.entities.items()
+        }
+        for dataset, (section, limit) in PROFILE_SECTIONS.items():
+            if dataset not in dataframes:
+                continue
+            fields = SECTION_FIELDS.get(dataset)
+            for company_id, rows in _rows_by_company(dataframes[dataset], dataset).items():
+                if company_id not in profiles:
+                    continue
+                records = [compact_row(row, fields) for _, row in rows.head(limit).iterrows()]
+                profiles[company_id][section] = records[0] if limit == 1 else records
+                if len(rows) > limit:
+                    profiles[company_id][f"{section}_total"] = len(rows)
+        self.profiles = profiles
+        self.entities = entities
+        return self
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Profile for a company ID or any spelling of its name"""
+        if name in self.profiles:
+            return self.profiles[name]
+        company_id = self.entities.company_id(name) if self.entities else None
+        if company_id is None and self.entities:
+            matches = self.entities.resolve(name, limit=1)
+            company_id = matches[0][0] if matches and matches[0][1] >= 80 else None
+        return self.profiles.get(company_id)
+
+
+def format_profile(profile: Dict) -> str:
+    """Render a profile as compact indented text for the LLM"""
+    lines = [f"{profile['name']} ({profile['company_id']})", f"aliases: {'; '.join(profile['aliases'])}"]
+    for key, value in profile.items():
+        if key in ('company_id', 'name', 'aliases'):
+            continue
+        if isinstance(value, dict):
+            lines.append(f"{key}: " + '; '.join(f"{k}={v}" for k, v in value.items()))
+        elif isinstance(value, list):
+            lines.append(f"{key}:")
+            lines.extend('  - ' + '; '.join(f"{k}={v}" for k, v in record.items()) for record in value)
+        else:
+            lines.append(f"{key}: {value}")
+    return '\n'.join(lines)
+
+
+def build_profile_store(dataframes: Dict[str, pd.DataFrame], entities: EntityIndex) -> CompanyProfileStore:
+    """Build the per-company profile store"""
+    return CompanyProfileStore().fit(dataframes, entities)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+from typing import List, Optional
+import pandas as pd
+
+# Detail levels tried in turn until a summary fits its token budget: (top values, sample chars)
+DETAIL_LEVELS = [(5, 80), (3, 50), (2, 30), (0, 0)]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _column_hash(column: pd.Series) -> bytes:
+    try:
+        hashes = pd.util.hash_pandas_object(column, index=False)
+    except TypeError:  # unhashable cells such as lists
+        hashes = pd.util.hash_pandas_object(column.astype(str), index=False)
+    return hashes.to_numpy().tobytes()
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Fingerprint of a DataFrame: shape, dtypes, index and vectorized per-column hashes"""
+    digest = hashlib.sha1(json.dumps([df.shape, [[str(c), str(t)] for c, t in df.dtypes.items()]]).encode())
+    digest.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    for _, column in df.items():
+        digest.update(_column_hash(column))
+    return digest.hexdigest()
+
+
+def _truncate(value, chars: int) -> str:
+    text = ' '.join(str(value).split())
+    return text if len(text) <= chars else text[:chars].rstrip() + '...'
+
+
+def _as_dates(values: pd.Series) -> Optional[pd.Series]:
+    """Parsed dates for a text column that holds dates, else None"""
+    if values.dtype == bool or pd.api.types.is_numeric_dtype(values):
+        return None
+    head = values.astype(str).head(20)
+    if not head.str.match(r'\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4}').all():
+        return None
+    dates = pd.to_datetime(values.astype(str), errors='coerce', format='mixed').dropna()
+    return dates if len(dates) else None
+
+
+def describe_column(column: pd.Series, top_n: int = 5, sample_chars: int = 80) -> str:
+    """One line: type, cardinality, nulls, then range, top values or a truncated sample"""
+    values = column.dropna()
+    if len(values) and values.map(lambda v: isinstance(v, list)).all():
+        values = values.explode().dropna()
+        kind = 'list'
+    else:
+        kind = str(column.dtype)
+    nulls = 100 * (1 - len(column.dropna()) / len(column)) if len(column) else 0
+    unique = values.astype(str).nunique()
+    line = f"- {column.name} ({kind}, {unique} unique, {nulls:.0f}% null)"
+    if not len(values):
+        return line
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return f"{line}: min {values.min():g}, median {values.median():g}, max {values.max():g}"
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return f"{line}: {values.min()} to {values.max()}"
+    dates = _as_dates(values)
+    if dates is not None:
+        return f"{line}: dates {dates.min():%Y-%m-%d} to {dates.max():%Y-%m-%d}"
+    counts = values.astype(str).value_counts()
+    if top_n and (counts.iloc[0] > 1 or unique <= top_n):
+        top = ', '.join(f"{_truncate(value, 40)} ({count})" for value, count in counts.head(top_n).items())
+        more = f", ... {unique - top_n} more" if unique > top_n else ''
+        return f"{line}: {top}{more}"
+    if sample_chars:
+        return f"{line}: e.g. {_truncate(values.iloc[0], sample_chars)!r}"
+    return line
+
+
+def summarize_dataframe(df: pd.DataFrame, name: str, max_tokens: int = 500) -> str:
+    """Compact description of a dataset for a system prompt, reducing detail until it fits max_tokens"""
+    header = f"{name}: {len(df)} rows x {len(df.columns)} columns"
+    lines: List[str] = []
+    for top_n, sample_chars in DETAIL_LEVELS:
+        lines = [header] + [describe_column(df[c], top_n, sample_chars) for c in df.columns]
+        if estimate_tokens('\n'.join(lines)) <= max_tokens:
+            return '\n'.join(lines)
+    kept, budget = [header], max_tokens
+    for line in lines[1:]:
+        if estimate_tokens('\n'.join(kept + [line, '- ... 999 more columns'])) > budget:
+            break
+        kept.append(line)
+    return '\n'.join(kept + [f"- ... {len(lines) - len(kept)} more columns"])
+
+
+def schema_summary(df: pd.DataFrame, name: str, max_tokens: int = 500, cache_dir: Optional[str] = None) -> str:
+    """summarize_dataframe, cached on disk per dataset version so workers and restarts reuse it"""
+    if not cache_dir:
+        return summarize_dataframe(df, name, max_tokens)
+    key = hashlib.sha1(f"{dataset_version(df)}\0{max_tokens}\0{DETAIL_LEVELS}".encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"{name}-{key}.txt")
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    summary = summarize_dataframe(df, name, max_tokens)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(summary)
+    os.replace(tmp, path)
+    return summary
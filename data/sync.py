@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from data.entities import normalize_company_name
+from data.vector_index import company_metadata
+
+
+def company_vector_id(name) -> str:
+    """Stable vector ID for a company, independent of row order"""
+    return normalize_company_name(name).replace(' ', '-')
+
+
+def _plain(value):
+    # Pinecone metadata only takes str, number, bool or list of str
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def company_records(all_companies: pd.DataFrame, text_key: str = 'Description') -> List[Tuple[str, str, Dict, str]]:
+    """(vector_id, text, metadata, content_hash) per company with text, keyed by company_id; the first row wins for duplicates"""
+    records, seen = [], set()
+    for row_id, row in all_companies.iterrows():
+        text = row.get(text_key)
+        company_id = row.get('company_id')
+        vector_id = company_id if isinstance(company_id, str) and company_id else company_vector_id(row.get('Companies', ''))
+        if pd.isna(text) or not str(text).strip() or not vector_id or vector_id in seen:
+            continue
+        seen.add(vector_id)
+        # Positional row ids change with every snapshot, so they are neither hashed nor stored
+        metadata = {key: _plain(value) for key, value in company_metadata(row_id, row).items() if key != 'row_id'}
+        metadata['company_id'] = vector_id
+        metadata[text_key] = str(text)
+        content_hash = hashlib.sha1(json.dumps(metadata, sort_keys=True, default=str).encode()).hexdigest()
+        records.append((vector_id, str(text), metadata, content_hash))
+    return records
+
+
+class SyncState:
+    """Content hash of every vector in the index, committed batch by batch, and whether a reconciling pass completed"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS vectors (id TEXT PRIMARY KEY, hash TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS flags (name TEXT PRIMARY KEY, value INTEGER)")
+        self.db.commit()
+        self.lock = threading.Lock()
+
+    def hashes(self) -> Dict[str, str]:
+        with self.lock:
+            return dict(self.db.execute("SELECT id, hash FROM vectors").fetchall())
+
+    def record(self, hashes: Dict[str, str]) -> None:
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO vectors (id, hash) VALUES (?, ?)", hashes.items())
+            self.db.commit()
+
+    def reconciled(self) -> bool:
+        with self.lock:
+            return bool(self.db.execute("SELECT value FROM flags WHERE name = 'reconciled'").fetchone())
+
+    def mark_reconciled(self) -> None:
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO flags (name, value) VALUES ('reconciled', 1)")
+            self.db.commit()
+
+    def forget(self, ids: List[str]) -> None:
+        with self.lock:
+            self.db.executemany("DELETE FROM vectors WHERE id = ?", [(i,) for i in ids])
+            self.db.commit()
+
+
+def index_ids(index, namespace: Optional[str] = None) -> List[str]:
+    """Every vector ID in a Pinecone index namespace, listed page by page"""
+    return [vector_id for page in index.list(namespace=namespace) for vector_id in page]
+
+
+def sync_company_embeddings(all_companies: pd.DataFrame, embeddings, index, state_path: str,
+                            batch_size: int = 100, max_concurrency: int = 4, text_key: str = 'Description',
+                            namespace: Optional[str] = None, reconcile: Optional[bool] = None) -> Dict[str, int]:
+    """Upsert changed companies and delete removed ones (with reconcile, also IDs missing from the snapshot)"""
+    state = SyncState(state_path)
+    known = state.hashes()
+    records = company_records(all_companies, text_key)
+    current = {record[0] for record in records}
+    changed = [record for record in records if known.get(record[0]) != record[3]]
+    removed = set(known) - current
+    if reconcile is None:
+        # Until one reconciling pass has completed (an interrupted first run leaves a partial manifest)
+        reconcile = not state.reconciled()
+    if reconcile:
+        removed |= set(index_ids(index, namespace)) - current
+    removed = sorted(removed)
+
+    def upsert(batch):
+        vectors = embeddings.embed_documents([text for _, text, _, _ in batch])
+        index.upsert(
+            vectors=[{'id': vector_id, 'values': values, 'metadata': metadata}
+                     for (vector_id, _, metadata, _), values in zip(batch, vectors)],
+            namespace=namespace,
+        )
+        state.record({vector_id: content_hash for vector_id, _, _, content_hash in batch})
+        return len(batch)
+
+    batches = [changed[start:start + batch_size] for start in range(0, len(changed), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        upserted = sum(pool.map(upsert, batches))
+
+    for start in range(0, len(removed), 1000):
+        ids = removed[start:start + 1000]
+        index.delete(ids=ids, namespace=namespace)
+        state.forget(ids)
+    if reconcile:
+        state.mark_reconciled()
+
+    return {'upserted': upserted, 'deleted': len(removed), 'unchanged': len(records) - len(changed)}
+
+
+if __name__ == "__main__":
+    import sys
+    from langchain_community.embeddings import OpenAIEmbeddings
+    from pinecone import Pinecone as PineconeClient
+    from config.settings import (
+        S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, OPENAI_API_KEY, PINECONE_API_KEY,
+        PINECONE_INDEX, EMBED_MODEL, EMBED_CACHE_PATH, SYNC_STATE_PATH, SYNC_BATCH_SIZE, SYNC_MAX_CONCURRENCY
+    )
+    from data.embeddings import CachedEmbeddings
+    from data.loaders import read_latest_csv_from_s3
+
+    all_companies, latest_file = read_latest_csv_from_s3(S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, 'all_companies/')
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBED_MODEL, api_key=OPENAI_API_KEY), model=EMBED_MODEL, path=EMBED_CACHE_PATH)
+    index = PineconeClient(api_key=PINECONE_API_KEY).Index(PINECONE_INDEX)
+    # --reconcile also deletes vectors the manifest does not know about (done automatically until a first full pass completes)
+    reconcile = True if '--reconcile' in sys.argv else None
+    stats = sync_company_embeddings(all_companies, embeddings, index, SYNC_STATE_PATH, SYNC_BATCH_SIZE, SYNC_MAX_CONCURRENCY, reconcile=reconcile)
+    print(f"Synced {latest_file['Key']}: {stats}")
@@ -0,0 +1,126 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Text columns indexed per dataset (keys match load_all_dataframes)
+TEXT_INDEX_COLUMNS = {
+    'meetings_df': ['title', 'page_content'],
+    'all_companies': ['Companies', 'Keywords', 'Description'],
+    'cap_tables_df': ['Company', 'Markdown Content'],
+}
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or that the their "
+    "there this to was were will with".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping dotted/hyphenated terms like 'ai-powered' or 'u.s' intact"""
+    return [t for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def combine_text_columns(df: pd.DataFrame, columns: Iterable[str]) -> pd.Series:
+    """Join the given text columns of each row into one searchable document"""
+    columns = [c for c in columns if c in df.columns]
+    if not columns:
+        return pd.Series('', index=df.index)
+    return df[columns].fillna('').astype(str).agg('\n'.join, axis=1)
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 ranking"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.fit([], [])
+
+    def fit(self, ids: Iterable, texts: Iterable[str]) -> "BM25Index":
+        postings = defaultdict(lambda: ([], []))
+        ids = list(ids)
+        texts = [str(t) if t is not None else '' for t in texts]
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for pos, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len[pos] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term][0].append(pos)
+                postings[term][1].append(tf)
+
+        self.ids = ids
+        self.positions = {row_id: pos for pos, row_id in enumerate(ids)}
+        self.texts = texts
+        self.doc_len = doc_len
+        self.avgdl = float(doc_len.mean()) if len(doc_len) else 0.0
+        self.postings = {
+            term: (np.asarray(positions, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (positions, tfs) in postings.items()
+        }
+        return self
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0]) if term in self.postings else 0
+        return float(np.log(1 + (len(self.ids) - df + 0.5) / (df + 0.5)))
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (zeros where no term matches)"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if not self.ids:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / max(self.avgdl, 1e-9))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            positions, tfs = self.postings[term]
+            scores[positions] += self.idf(term) * tfs * (self.k1 + 1) / (tfs + norm[positions])
+        return scores
+
+    def search(self, query: str, k: int = 10, mask: Optional[np.ndarray] = None) -> List[Tuple[object, float]]:
+        """Up to k (row_id, score) pairs by BM25 score, restricted to mask (one flag per document) if given"""
+        scores = self.score(query)
+        if mask is not None:
+            scores[~mask] = 0
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return []
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+        return [(self.ids[pos], float(scores[pos])) for pos in hits]
+
+    def snippet(self, row_id, query: str, width: int = 240) -> str:
+        """Short window of the row's text around the first query term match"""
+        text = self.texts[self.positions[row_id]] if row_id in self.positions else ''
+        lowered = text.lower()
+        starts = [lowered.find(term) for term in tokenize(query)]
+        starts = [s for s in starts if s >= 0]
+        start = max(min(starts) - width // 4, 0) if starts else 0
+        snippet = ' '.join(text[start:start + width].split())
+        prefix = '...' if start > 0 else ''
+        suffix = '...' if start + width < len(text) else ''
+        return f"{prefix}{snippet}{suffix}"
+
+
+def build_text_indexes(dataframes: Dict[str, pd.DataFrame]) -> Dict[str, BM25Index]:
+    """Build the BM25 indexes over each dataset's text columns"""
+    return {
+        name: BM25Index().fit(dataframes[name].index, combine_text_columns(dataframes[name], columns))
+        for name, columns in TEXT_INDEX_COLUMNS.items()
+    }
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Iterable], k: int = 60) -> List[Tuple[object, float]]:
+    """Fuse several ranked lists of IDs into one ranking (Cormack et al. RRF)"""
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, row_id in enumerate(ranking):
+            fused[row_id] += 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,298 @@
+import hashlib
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from data.embedding_store import EmbeddingStore
+
+# Metadata kept on each company document (whichever are present)
+METADATA_COLUMNS = ['Companies', 'Vertical', 'Country', 'Date Received by Sante', 'company_id']
+# Numeric copy of the received date, so vector stores can range-filter on it
+DATE_RECEIVED_COLUMN = 'Date Received by Sante'
+DATE_RECEIVED_KEY = 'date_received_ts'
+# IVF structure inside a local index directory; the vectors live in its EmbeddingStore files
+IVF_FILE = 'ivf.npz'
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class IVFIndex:
+    """Inverted-file index over unit vectors, with nprobe tuned at fit time to reach target_recall"""
+
+    def __init__(self, target_recall: float = 0.95, exact_threshold: int = 5000, seed: int = 0):
+        self.target_recall = target_recall
+        self.exact_threshold = exact_threshold
+        self.seed = seed
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.store: Optional[EmbeddingStore] = None
+        self.centroids = None
+        self.assignments = None
+        self.lists: List[np.ndarray] = []
+        self.nprobe = 0
+
+    def fit(self, vectors: np.ndarray, n_lists: Optional[int] = None, n_iter: int = 10, train_size: int = 20000) -> "IVFIndex":
+        self.vectors = normalize_rows(vectors)
+        n = len(self.vectors)
+        if n <= self.exact_threshold:
+            self.centroids, self.assignments, self.lists, self.nprobe = None, None, [], 0
+            return self
+
+        rng = np.random.default_rng(self.seed)
+        n_lists = n_lists or int(4 * np.sqrt(n))
+        train = self.vectors[rng.choice(n, size=min(n, train_size), replace=False)]
+        centroids = train[rng.choice(len(train), size=n_lists, replace=False)]
+        for _ in range(n_iter):
+            labels = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, train)
+            empty = np.bincount(labels, minlength=n_lists) == 0
+            sums[empty] = train[rng.choice(len(train), size=int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+
+        self._set_lists(centroids, self._assign(centroids))
+        self.nprobe = self.tune_nprobe()
+        return self
+
+    def attach(self, store: EmbeddingStore) -> "IVFIndex":
+        """Serve vectors from a store holding the same rows, dropping the in-memory copy"""
+        self.store = store
+        self.vectors = store.vectors
+        return self
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append vectors, each to the list of its nearest centroid; returns their positions"""
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        start = len(self.vectors)
+        if self.store is not None:
+            self.attach(self.store.extend(vectors))
+        else:
+            self.vectors = np.concatenate([self.vectors, vectors]) if len(self.vectors) else vectors
+        positions = np.arange(start, start + len(vectors))
+        if self.centroids is not None:
+            labels = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+            self.assignments = np.concatenate([self.assignments, labels])
+            for label in np.unique(labels):
+                self.lists[label] = np.concatenate([self.lists[label], positions[labels == label]])
+        return positions
+
+    def _assign(self, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(self.vectors[start:start + batch_size] @ centroids.T, axis=1)
+            for start in range(0, len(self.vectors), batch_size)
+        ]).astype(np.int32)
+
+    def _set_lists(self, centroids: np.ndarray, assignments: np.ndarray) -> None:
+        self.centroids = centroids
+        self.assignments = assignments
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (positions, cosine scores); mask restricts the candidate rows"""
+        query = normalize_rows(query)
+        if mask is not None and mask.sum() <= max(self.exact_threshold, len(self.vectors) // 10):
+            # Selective filters: scanning the matching rows exactly is cheap and keeps full recall
+            candidates = np.flatnonzero(mask)
+            mask = None
+        elif self.centroids is None:
+            candidates = np.arange(len(self.vectors))
+        else:
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([self.lists[i] for i in probes])
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        if not len(candidates):
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+        if self.store is not None:
+            return self.store.top_k(query, candidates, k)
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return candidates[top], scores[top]
+
+    def tune_nprobe(self, k: int = 10, sample: int = 200) -> int:
+        """Smallest nprobe whose recall@k on sampled corpus queries reaches target_recall"""
+        rng = np.random.default_rng(self.seed)
+        queries = self.vectors[rng.choice(len(self.vectors), size=min(sample, len(self.vectors)), replace=False)]
+        exact = [set(np.argpartition(-(self.vectors @ q), k - 1)[:k]) for q in queries]
+        nprobe = 1
+        while nprobe < len(self.centroids):
+            found = sum(len(truth & set(self.search(q, k, nprobe)[0])) for q, truth in zip(queries, exact))
+            if found / (k * len(queries)) >= self.target_recall:
+                break
+            nprobe *= 2
+        return min(nprobe, len(self.centroids))
+
+    def save(self, path: str, fingerprint: str = '') -> None:
+        """Persist the index; vectors are left out when they live in an attached store"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        vectors = self.vectors if self.store is None else np.zeros((0, 0), dtype=np.float32)
+        np.savez(
+            path, vectors=vectors, fingerprint=np.array(fingerprint),
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, 0), dtype=np.float32),
+            assignments=self.assignments if self.assignments is not None else np.zeros(0, dtype=np.int32),
+            nprobe=np.array(self.nprobe),
+        )
+
+    @classmethod
+    def load(cls, path: str, store: Optional[EmbeddingStore] = None, **kwargs) -> Tuple["IVFIndex", str]:
+        index = cls(**kwargs)
+        with np.load(path) as data:
+            if store is not None:
+                index.attach(store)
+            else:
+                index.vectors = data['vectors']
+            if len(data['centroids']):
+                index._set_lists(data['centroids'], data['assignments'])
+            index.nprobe = int(data['nprobe'])
+            fingerprint = str(data['fingerprint'])
+        return index, fingerprint
+
+
+class LocalVectorStore(VectorStore):
+    """In-memory company vector store over an IVFIndex, usable wherever PineconeVectorStore is"""
+
+    def __init__(self, embedding: Embeddings, index: IVFIndex, texts: List[str], metadatas: List[Dict]):
+        self.embedding = embedding
+        self.index = index
+        self.texts = texts
+        self.metadatas = metadatas
+        self.metadata_frame = pd.DataFrame(metadatas)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1) / 2
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[Dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed and index more documents in memory; the saved index is rebuilt from the next snapshot"""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = [dict(m) for m in metadatas] if metadatas else [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        for metadata, id_ in zip(metadatas, ids):
+            metadata.setdefault('row_id', id_)
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        self.index.add(vectors)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas)
+        self.metadata_frame = pd.DataFrame(self.metadatas)
+        return ids
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[Dict]] = None, **kwargs: Any) -> "LocalVectorStore":
+        texts = list(texts)
+        store = cls(embedding, IVFIndex(), [], [])
+        store.add_texts(texts, metadatas, **kwargs)
+        store.index.fit(store.index.vectors)
+        return store
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4, filter: Optional[Dict] = None, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Nearest documents; filter takes the same metadata syntax as Pinecone and is applied before ranking"""
+        positions, scores = self.index.search(np.asarray(embedding, dtype=np.float32), k, mask=metadata_mask(self.metadata_frame, filter))
+        return [(Document(page_content=self.texts[p], metadata=self.metadatas[p]), float(s)) for p, s in zip(positions, scores)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k, **kwargs)
+
+    async def asimilarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        # The index search itself is in-memory and takes well under a millisecond
+        return self.similarity_search_by_vector_with_score(embedding, k, **kwargs)
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(await self.embedding.aembed_query(query), k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+
+def date_to_timestamp(value) -> Optional[int]:
+    """Unix seconds for a date-like value (metadata range filters need numbers), None if unparseable"""
+    date = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(date) else int(date.timestamp())
+
+
+def company_metadata(row_id, row: pd.Series) -> Dict:
+    """Metadata stored with a company's document"""
+    metadata = {'row_id': row_id, **{c: row[c] for c in METADATA_COLUMNS if c in row.index and not pd.isna(row[c])}}
+    received = date_to_timestamp(row.get(DATE_RECEIVED_COLUMN))
+    if received is not None:
+        metadata[DATE_RECEIVED_KEY] = received
+    return metadata
+
+
+def metadata_mask(frame: pd.DataFrame, filter: Optional[Dict]) -> Optional[np.ndarray]:
+    """Rows of frame matching a Pinecone-style metadata filter ($eq, $in, $gt, ..., $and/$or), or None"""
+    if not filter:
+        return None
+    mask = np.ones(len(frame), dtype=bool)
+    for key, condition in filter.items():
+        if key in ('$and', '$or'):
+            masks = [metadata_mask(frame, clause) for clause in condition]
+            combined = np.logical_and.reduce(masks) if key == '$and' else np.logical_or.reduce(masks)
+            mask &= combined
+            continue
+        if key not in frame.columns:
+            mask &= False
+            continue
+        column = frame[key]
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        for op, value in condition.items():
+            if op == '$eq':
+                mask &= (column == value).to_numpy()
+            elif op == '$ne':
+                mask &= (column != value).to_numpy()
+            elif op == '$in':
+                mask &= column.isin(value).to_numpy()
+            elif op == '$nin':
+                mask &= ~column.isin(value).to_numpy()
+            else:
+                numeric = pd.to_numeric(column, errors='coerce')
+                compare = {'$gt': numeric.gt, '$gte': numeric.ge, '$lt': numeric.lt, '$lte': numeric.le}[op]
+                mask &= compare(value).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def company_documents(all_companies: pd.DataFrame, text_key: str = 'Description') -> Tuple[List[str], List[Dict]]:
+    """Texts and metadata of every company with a non-empty text_key"""
+    rows = all_companies[all_companies[text_key].fillna('').astype(str).str.strip() != '']
+    metadatas = [company_metadata(row_id, row) for row_id, row in rows.iterrows()]
+    return rows[text_key].astype(str).tolist(), metadatas
+
+
+def build_local_vectorstore(all_companies: pd.DataFrame, embeddings: Embeddings, path: Optional[str] = None,
+                            text_key: str = 'Description', model: str = '') -> LocalVectorStore:
+    """Local company vector store; with a path, embeddings are memory-mapped and reused while the texts are unchanged"""
+    texts, metadatas = company_documents(all_companies, text_key)
+    fingerprint = hashlib.sha1('\0'.join([model, *texts]).encode()).hexdigest()
+    store = EmbeddingStore.open(path) if path else None
+    ivf_path = os.path.join(path, IVF_FILE) if path else None
+    if store is not None and store.fingerprint == fingerprint and os.path.exists(ivf_path):
+        index, saved_fingerprint = IVFIndex.load(ivf_path, store)
+        if saved_fingerprint == fingerprint:
+            return LocalVectorStore(embeddings, index, texts, metadatas)
+    index = IVFIndex().fit(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+    if path:
+        index.attach(EmbeddingStore.write(path, index.vectors, fingerprint))
+        index.save(ivf_path, fingerprint)
+    return LocalVectorStore(embeddings, index, texts, metadatas)
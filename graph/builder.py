@@ -1,4 +1,4 @@
-from langgraph.graph import START, END, StateGraph, MessagesState
+from langgraph.graph import START, END, StateGraph
 from agents.companies import create_companies_agent
 from agents.deals import create_deals_agent
 from agents.funding import create_funding_agent
@@ -9,19 +9,22 @@ from agents.cap_tables import create_cap_tables_agent
 from agents.search import create_search_agent
 from agents.tavily import create_tavily_agent
 from tools.custom_tools import create_custom_tools
-from config.settings import OPENAI_API_KEY
-from langchain_openai import ChatOpenAI
+from tools.executor import ParallelToolNode, create_tool_executor
+from graph.events import emit
+from graph.state import AgentState
+from graph.compaction import compact_history
+from config.settings import OPENAI_API_KEY, TOOL_THREAD_WORKERS, SUPERVISOR_CONTEXT_TOKENS
+from agents.llm import get_llm
 from langchain_core.messages import SystemMessage
-from langgraph.prebuilt import tools_condition, ToolNode
+from langchain_core.runnables import RunnableLambda
+from langgraph.prebuilt import tools_condition
 from typing import Literal
 
-def supervisor(state: MessagesState):
-    supervisor_llm = ChatOpenAI(model="gpt-4o", temperature=0, api_key=OPENAI_API_KEY)
-    supervisor_msg = SystemMessage(content="""You are the supervisor at Sante Ventures.
+SUPERVISOR_MSG = SystemMessage(content="""You are the supervisor at Sante Ventures.
 Your job is to:
 1. Understand the user's request about venture capital, healthcare companies, investments, meetings, cap tables, or deals
 2. Route the request to the appropriate specialist:
-   - Companies Specialist: for general company information
+   - Companies Specialist: for general company information, including complete company profiles ("tell me everything about X")
    - Deals Specialist: for deal-related queries
    - Funding Specialist: for deal analysis of companies who have received additional funding by their lead investors
    - Santé Companies Specialist: for companies reviewed by Santé 
@@ -33,10 +36,20 @@ Your job is to:
 3. Explain which specialist you're routing to and why
 
 When routing, use the exact phrase "Routing to [Specialist Name]" where Specialist Name is one of the above.""")
-    response = supervisor_llm.invoke([supervisor_msg] + state["messages"])
-    return {"messages": [response]}
 
-def route_to_specialist(state: MessagesState) -> Literal["companies", "deals", "funding", "sante_companies", "exits", "meetings", "cap_tables", "search", "tavily", END]:
+def supervisor(state: AgentState):
+    messages, compacted = compact_history(state, SUPERVISOR_CONTEXT_TOKENS)
+    response = get_llm("gpt-4o", 0, OPENAI_API_KEY).invoke([SUPERVISOR_MSG] + messages)
+    emit("route", specialist=route_to_specialist({"messages": [response]}))
+    return {"messages": [response], "compacted": compacted, "iterations": 0, "started_at": None}
+
+async def asupervisor(state: AgentState):
+    messages, compacted = compact_history(state, SUPERVISOR_CONTEXT_TOKENS)
+    response = await get_llm("gpt-4o", 0, OPENAI_API_KEY).ainvoke([SUPERVISOR_MSG] + messages)
+    emit("route", specialist=route_to_specialist({"messages": [response]}))
+    return {"messages": [response], "compacted": compacted, "iterations": 0, "started_at": None}
+
+def route_to_specialist(state: AgentState) -> Literal["companies", "deals", "funding", "sante_companies", "exits", "meetings", "cap_tables", "search", "tavily", END]:
     last_message = state["messages"][-1].content
     if "Routing to Companies Specialist" in last_message:
         return "companies"
@@ -59,30 +72,39 @@ def route_to_specialist(state: MessagesState) -> Literal["companies", "deals", "
     return END
 
 def build_graph(dataframes, vectorstore, tools):
-    builder = StateGraph(MessagesState)
-    builder.add_node("supervisor", supervisor)
+    builder = StateGraph(AgentState)
+    builder.add_node("supervisor", RunnableLambda(supervisor, afunc=asupervisor, name="supervisor"))
+
+    # Create agents
+    resolve = tools['resolve_company']
+    agents = {
+        "companies": create_companies_agent(tools['all_companies_tool'], OPENAI_API_KEY, [tools['get_company_profile'], resolve, tools['search_text']]),
+        "deals": create_deals_agent(tools['all_deals_tool'], OPENAI_API_KEY, [resolve]),
+        "funding": create_funding_agent(tools['funding_deals_tool'], OPENAI_API_KEY, [resolve]),
+        "sante_companies": create_sante_companies_agent(tools['sante_companies_tool'], OPENAI_API_KEY, [resolve]),
+        "exits": create_exits_agent(tools['exit_deals_tool'], OPENAI_API_KEY, [resolve]),
+        "meetings": create_meetings_agent(tools['meetings_tool'], OPENAI_API_KEY, [resolve, tools['search_text'], tools['search_meeting_passages']]),
+        "cap_tables": create_cap_tables_agent(tools['cap_tables_tool'], OPENAI_API_KEY, [resolve, tools['query_cap_tables'], tools['search_text']]),
+        "search": create_search_agent(tools['search_companies'], OPENAI_API_KEY, [tools['search_companies_batch'], tools['similar_companies']]),
+        "tavily": create_tavily_agent(tools['tavily_search'], OPENAI_API_KEY, [tools['web_search_batch']]),
+    }
 
-    # Add agent nodes
-    builder.add_node("companies", create_companies_agent(tools['all_companies_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("deals", create_deals_agent(tools['all_deals_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("funding", create_funding_agent(tools['funding_deals_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("sante_companies", create_sante_companies_agent(tools['sante_companies_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("exits", create_exits_agent(tools['exit_deals_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("meetings", create_meetings_agent(tools['meetings_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("cap_tables", create_cap_tables_agent(tools['cap_tables_tool'], OPENAI_API_KEY).agent)
-    builder.add_node("search", create_search_agent(tools['search_companies'], OPENAI_API_KEY).agent)
-    builder.add_node("tavily", create_tavily_agent(tools['tavily_search'], OPENAI_API_KEY).agent)
+    # Add agent nodes (sync and async, so the graph serves both invoke and ainvoke)
+    for specialist, agent in agents.items():
+        builder.add_node(specialist, agent.node)
 
-    # Add tool nodes (ensure all are included)
-    builder.add_node("all_companies_repl_tools", ToolNode([tools['all_companies_tool']]))
-    builder.add_node("all_deals_repl_tools", ToolNode([tools['all_deals_tool']]))
-    builder.add_node("funding_deals_repl_tools", ToolNode([tools['funding_deals_tool']]))
-    builder.add_node("sante_companies_repl_tools", ToolNode([tools['sante_companies_tool']]))
-    builder.add_node("exit_deals_repl_tools", ToolNode([tools['exit_deals_tool']]))
-    builder.add_node("meetings_repl_tools", ToolNode([tools['meetings_tool']]))
-    builder.add_node("cap_tables_repl_tools", ToolNode([tools['cap_tables_tool']]))
-    builder.add_node("search_companies_tools", ToolNode([tools['search_companies']]))
-    builder.add_node("tavily_search_tools", ToolNode([tools['tavily_search']]))
+    # Add tool nodes (each specialist's tool node serves every tool bound to it and
+    # runs a turn's tool calls concurrently on the shared executor)
+    executor = create_tool_executor(TOOL_THREAD_WORKERS)
+    builder.add_node("all_companies_repl_tools", ParallelToolNode(agents["companies"].tools, executor, agents["companies"].max_seconds).node)
+    builder.add_node("all_deals_repl_tools", ParallelToolNode(agents["deals"].tools, executor, agents["deals"].max_seconds).node)
+    builder.add_node("funding_deals_repl_tools", ParallelToolNode(agents["funding"].tools, executor, agents["funding"].max_seconds).node)
+    builder.add_node("sante_companies_repl_tools", ParallelToolNode(agents["sante_companies"].tools, executor, agents["sante_companies"].max_seconds).node)
+    builder.add_node("exit_deals_repl_tools", ParallelToolNode(agents["exits"].tools, executor, agents["exits"].max_seconds).node)
+    builder.add_node("meetings_repl_tools", ParallelToolNode(agents["meetings"].tools, executor, agents["meetings"].max_seconds).node)
+    builder.add_node("cap_tables_repl_tools", ParallelToolNode(agents["cap_tables"].tools, executor, agents["cap_tables"].max_seconds).node)
+    builder.add_node("search_companies_tools", ParallelToolNode(agents["search"].tools, executor, agents["search"].max_seconds).node)
+    builder.add_node("tavily_search_tools", ParallelToolNode(agents["tavily"].tools, executor, agents["tavily"].max_seconds).node)
 
     # Add edges
     builder.add_edge(START, "supervisor")
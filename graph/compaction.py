@@ -0,0 +1,84 @@
+import json
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from data.schema_summary import estimate_tokens
+from config.settings import COMPACT_KEEP_TURNS, COMPACT_TOOL_CHARS
+
+
+def message_tokens(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    calls = getattr(message, 'tool_calls', None)
+    return estimate_tokens(content + (json.dumps(calls, default=str) if calls else ''))
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Messages grouped into turns, each starting at a human message (so tool calls stay with their results)"""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if not turns or isinstance(message, HumanMessage):
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def compact_tool_output(message: ToolMessage, chars: int) -> Optional[str]:
+    """Head of a tool result with a note of what was left out, or None if it is already short"""
+    text = ' '.join(str(message.content).split())
+    if len(text) <= chars:
+        return None
+    return f"{text[:chars].rstrip()} ... [{len(text) - chars} more chars of {message.name or 'tool'} output omitted]"
+
+
+def compact_messages(
+    messages: Sequence[BaseMessage],
+    cache: Dict[str, str],
+    max_tokens: int,
+    keep_turns: int = 2,
+    tool_chars: int = 300,
+) -> Tuple[List[BaseMessage], Dict[str, str]]:
+    """History within max_tokens, plus the cache entries (message id -> content) this call added"""
+    added: Dict[str, str] = {}
+
+    def compacted(message: BaseMessage) -> BaseMessage:
+        content = cache.get(message.id) or added.get(message.id)
+        if content is None and isinstance(message, ToolMessage):
+            content = compact_tool_output(message, tool_chars)
+            if content is not None and message.id:
+                added[message.id] = content
+        return message if content is None else message.model_copy(update={'content': content})
+
+    turns = split_turns(messages)
+    keep = max(keep_turns, 1)
+    # Only older turns go through the shared cache; cutting recent turns to fit this caller's budget stays local
+    older = [[compacted(m) for m in turn] for turn in turns[:-keep]]
+    recent = turns[-keep:]
+
+    total = sum(message_tokens(m) for m in chain(*older, *recent))
+    while older and total > max_tokens:
+        total -= sum(message_tokens(m) for m in older.pop(0))
+
+    if total > max_tokens:
+        flat = list(chain(*recent))
+        # Results of the latest tool calls are what the model is about to read
+        pending = len(flat)
+        while pending and isinstance(flat[pending - 1], ToolMessage):
+            pending -= 1
+        for i in range(pending):
+            if total <= max_tokens:
+                break
+            before = message_tokens(flat[i])
+            content = compact_tool_output(flat[i], tool_chars) if isinstance(flat[i], ToolMessage) else None
+            if content is not None:
+                flat[i] = flat[i].model_copy(update={'content': content})
+            total -= before - message_tokens(flat[i])
+        recent = [flat]
+
+    return list(chain(*older, *recent)), added
+
+
+def compact_history(state, max_tokens: int) -> Tuple[List[BaseMessage], Dict[str, str]]:
+    """A node's view of the thread: state["messages"] compacted to max_tokens (see compact_messages)"""
+    return compact_messages(
+        state["messages"], state.get("compacted") or {}, max_tokens, COMPACT_KEEP_TURNS, COMPACT_TOOL_CHARS
+    )
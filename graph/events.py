@@ -0,0 +1,24 @@
+from typing import Any, Callable
+from langgraph.config import get_stream_writer
+
+# Status events are sent on the graph's "custom" stream, next to LLM tokens on the "messages" stream:
+#   for mode, chunk in graph.stream(inputs, stream_mode=["messages", "custom"]): ...
+# Each event is a dict with an "event" key:
+#   route       {"specialist"}                 supervisor's routing decision (langgraph END, "__end__", when it answers itself)
+#   tool_start  {"tool", "tool_call_id"}
+#   tool_end    {"tool", "tool_call_id", "elapsed_ms", "error"}
+#   limit       {"agent", "iterations", "elapsed_ms"}   agent hit its round or time limit and must answer;
+#               iterations = tool-calling rounds completed (equals max_iterations when the round limit was hit)
+#   usage       {"node", "input_tokens", "cached_tokens", "uncached_tokens"}   per LLM call (agents/usage.py)
+
+
+def stream_writer() -> Callable[[Any], None]:
+    """Writer for the current run's custom stream (no-op outside a run); capture it on the node's own thread"""
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return lambda chunk: None
+
+
+def emit(event: str, writer: Callable[[Any], None] = None, **data) -> None:
+    (writer or stream_writer())({"event": event, **data})
@@ -0,0 +1,16 @@
+from typing import Annotated, Dict, Optional
+from langgraph.graph import MessagesState
+
+
+def merge_compacted(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    return {**left, **right} if right else left
+
+
+class AgentState(MessagesState):
+    # Compacted content of older messages by message id (graph/compaction.py); kept for
+    # the whole thread so each message is compacted once and reads the same on every call
+    compacted: Annotated[Dict[str, str], merge_compacted]
+    # Current specialist's model calls (= tool-calling rounds completed) and start time (epoch seconds) for this request;
+    # reset by the supervisor, checked against the agent's limits (agents/base.py)
+    iterations: int
+    started_at: Optional[float]
@@ -1,28 +1,40 @@
-from data.loaders import load_all_dataframes
+from data.loaders import load_all_dataframes, build_indexes
 from config.settings import (
     S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY,
-    OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX, EMBED_MODEL
+    OPENAI_API_KEY, PINECONE_API_KEY, PINECONE_INDEX, EMBED_MODEL,
+    EMBED_CACHE_PATH, EMBED_CACHE_SIZE, VECTOR_BACKEND, LOCAL_INDEX_PATH, KNN_GRAPH_PATH, KNN_GRAPH_K
 )
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone as PineconeClient
 from langchain_community.embeddings import OpenAIEmbeddings
+from data.embeddings import CachedEmbeddings
+from data.vector_index import build_local_vectorstore
 from tools.custom_tools import create_custom_tools
 from graph.builder import build_graph
+from agents.usage import PROMPT_CACHE_USAGE, PromptCacheReport
 from langgraph.graph import MessagesState
 
 
 # Load data
 dataframes = load_all_dataframes(S3_BUCKET_NAME, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY)
+# Query and document embeddings go through an in-process LRU backed by an on-disk store
+embeddings = CachedEmbeddings(
+    OpenAIEmbeddings(model=EMBED_MODEL, api_key=OPENAI_API_KEY),
+    model=EMBED_MODEL, path=EMBED_CACHE_PATH, max_size=EMBED_CACHE_SIZE
+)
+indexes = build_indexes(dataframes, embeddings, knn_graph_path=KNN_GRAPH_PATH, embed_model=EMBED_MODEL, knn_graph_k=KNN_GRAPH_K)
 
-# Initialize Pinecone and vector store
-pc = PineconeClient(api_key=PINECONE_API_KEY)
-pinecone_index = pc.Index(PINECONE_INDEX)
-embeddings = OpenAIEmbeddings(model=EMBED_MODEL, api_key=OPENAI_API_KEY)
-vectorstore = PineconeVectorStore(index=pinecone_index, embedding=embeddings, text_key="Description")
+# Initialize the company vector store
+if VECTOR_BACKEND == "local":
+    vectorstore = build_local_vectorstore(dataframes['all_companies'], embeddings, LOCAL_INDEX_PATH, model=EMBED_MODEL)
+else:
+    pc = PineconeClient(api_key=PINECONE_API_KEY)
+    pinecone_index = pc.Index(PINECONE_INDEX)
+    vectorstore = PineconeVectorStore(index=pinecone_index, embedding=embeddings, text_key="Description")
 
 # Create tools
-tools = create_custom_tools(dataframes, vectorstore)
+tools = create_custom_tools(dataframes, vectorstore, indexes)
 
-# Build the graph
-graph = build_graph(dataframes, vectorstore, tools)
+# Build the graph (prompt cache totals are logged after every run)
+graph = build_graph(dataframes, vectorstore, tools).with_config(callbacks=[PromptCacheReport(PROMPT_CACHE_USAGE)])
     
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.embeddings import Embeddings
+
+# config.settings reads these at import time
+os.environ.setdefault("TEMPERATURE", "0")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+CAP_TABLE_MARKDOWN = """# Cap Table
+
+| Shareholder | Common | Series A Preferred | Options | Total |
+|---|---|---|---|---|
+| Jane Founder | 4,000,000 | | | 4,000,000 |
+| Santé Health Ventures III, L.P. | | 3,500,000 | | 3,500,000 |
+| Option Pool | | | 2,500,000 | 2,500,000 |
+| **Total** | 4,000,000 | 3,500,000 | 2,500,000 | 10,000,000 |
+"""
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Deterministic offline embeddings: hashed word counts"""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self.vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self.vector(text)
+
+    def vector(self, text):
+        vector = np.full(self.dim, 1e-3)
+        for word in str(text).lower().split():
+            vector[zlib.crc32(word.strip('.,').encode()) % self.dim] += 1
+        return vector.tolist()
+
+
+@pytest.fixture(autouse=True)
+def web_cache_path(tmp_path, monkeypatch):
+    """Tools built by tests cache web searches under tmp_path, not in the working tree"""
+    monkeypatch.setattr('tools.custom_tools.WEB_CACHE_PATH', str(tmp_path / 'web_search.sqlite'))
+
+
+@pytest.fixture
+def embeddings():
+    return BagOfWordsEmbeddings()
+
+
+@pytest.fixture
+def dataframes():
+    from data.cap_tables import extract_cap_table_entries
+    cap_tables = pd.DataFrame({"Company": ["Acme Health"], "URL": ["http://x"], "Markdown Content": [CAP_TABLE_MARKDOWN]})
+    return {
+        'all_companies': pd.DataFrame({
+            "Companies": ["Acme Health, Inc.", "BetaBio LLC", "Cardio AI", "DermaScan GmbH"],
+            "Description": ["Remote patient monitoring platform for cardiology.",
+                            "Biomarker discovery using proteomics and CRISPR screens.",
+                            "AI-powered ECG diagnostics for hospitals.",
+                            "Skin cancer AI diagnostics app in Germany."],
+            "Keywords": ["RPM, cardiology", "biomarker discovery, proteomics", "AI diagnostics, ECG", "dermatology, AI diagnostics"],
+            "Vertical": ["Digital Health", "Therapeutics", "Digital Health", "Digital Health"],
+            "Country": ["United States", "United States", "United States", "Germany"],
+            "Date Received by Sante": ["2023-01-05", "2022-06-01", "2024-03-10", "2024-07-01"],
+        }),
+        'all_deals': pd.DataFrame({"Companies": ["Acme Health", "Beta Bio", "Cardio AI Inc"], "Deal Size": [10.0, 25.0, 5.0],
+                                   "Deal Date": ["2023-02-01", "2022-07-01", "2024-04-01"]}),
+        'sante_seen_additional_funding_deals': pd.DataFrame({"Companies": ["Acme Health Inc"], "Deal Date": ["2024-05-01"]}),
+        'sante_seen_all_companies': pd.DataFrame({"Companies": ["Acme Health", "DermaScan"]}),
+        'sante_seen_exit_deals': pd.DataFrame({"Companies": ["BetaBio"], "Deal Date": ["2024-09-01"]}),
+        'meetings_df': pd.DataFrame({
+            "page_content": ["Board meeting. Acme discussed RPM reimbursement codes.\n\nRevenue grew 40%.",
+                             "MAM notes. Cardio AI ECG FDA clearance expected Q3.",
+                             "LP meeting update on fund III performance."],
+            "title": ["Acme Board Q1", "MAM Jan", "LP Update"],
+            "companies": ["Acme Health", "Cardio AI', 'Acme Health", "nan"],
+            "types": ["Board Meeting", "MAM", "LP Meeting"],
+            "date": ["2024-01-15", "2024-01-20", "2024-02-01"],
+        }),
+        'cap_tables_df': cap_tables,
+        'cap_table_entries': extract_cap_table_entries(cap_tables),
+    }
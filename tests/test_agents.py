@@ -0,0 +1,40 @@
+import time
+import pytest
+from langchain_core.messages import HumanMessage
+from agents.base import FINAL_ANSWER_MSG
+from agents.search import create_search_agent
+from tools.custom_tools import create_custom_tools
+from data.loaders import build_indexes
+
+
+@pytest.fixture
+def agent(dataframes, embeddings):
+    tools = create_custom_tools(dataframes, None, build_indexes(dataframes, embeddings))
+    return create_search_agent(tools['search_companies'], 'sk-test')
+
+
+def prepare(agent, monkeypatch, **state):
+    events = []
+    monkeypatch.setattr('agents.base.emit', lambda event, **data: events.append({"event": event, **data}))
+    llm, messages, update = agent.prepare({"messages": [HumanMessage("find AI diagnostics companies")], **state})
+    return llm, messages, update, events
+
+
+def test_tools_stay_available_until_the_round_limit(agent, monkeypatch):
+    llm, messages, update, events = prepare(agent, monkeypatch)
+    assert llm is agent.llm and events == []
+    assert update["iterations"] == 1 and update["started_at"] <= time.time()
+    llm, _, update, events = prepare(agent, monkeypatch, iterations=agent.max_iterations - 1, started_at=time.time())
+    assert llm is agent.llm and update["iterations"] == agent.max_iterations
+
+
+def test_round_limit_forces_an_answer_and_reports_completed_rounds(agent, monkeypatch):
+    llm, messages, update, events = prepare(agent, monkeypatch, iterations=agent.max_iterations, started_at=time.time())
+    assert llm is agent.answer_llm and messages[-1] is FINAL_ANSWER_MSG
+    assert [(e["event"], e["iterations"]) for e in events] == [("limit", agent.max_iterations)]
+
+
+def test_time_limit_forces_an_answer(agent, monkeypatch):
+    llm, _, _, events = prepare(agent, monkeypatch, iterations=1, started_at=time.time() - agent.max_seconds)
+    assert llm is agent.answer_llm
+    assert events[0]["iterations"] == 1 and events[0]["elapsed_ms"] >= 1000 * agent.max_seconds
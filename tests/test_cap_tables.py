@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from data.cap_tables import (
+    CapTableStore, extract_cap_table_entries, normalize_cap_table, parse_markdown_tables, parse_number, share_class_round
+)
+
+CAP_TABLE = """# Acme cap table
+
+| Stockholder | Common | Series A Preferred | % Fully Diluted |
+|---|---|---|---|
+| Founder | 6,000,000 | | 60% |
+| **Fund I** | | 4,000,000 | 40% |
+| Total | 6,000,000 | 4,000,000 | 100% |
+"""
+
+
+def test_parse_number():
+    assert parse_number('4,000,000') == 4000000
+    assert parse_number('(1,200)') == -1200
+    assert parse_number('$12.5') == 12.5
+    assert np.isnan(parse_number('-'))
+    assert np.isnan(parse_number(''))
+
+
+def test_share_class_round():
+    assert share_class_round('Series A-1 Preferred') == 'Series A-1'
+    assert share_class_round('Seed Preferred') == 'Seed'
+    assert share_class_round('Pre-Seed SAFE') == 'Pre-Seed'
+    assert share_class_round('Common Stock') == 'Common'
+    assert share_class_round('Option Pool') == 'Options'
+    assert share_class_round('Class Z') == 'Class Z'
+
+
+def test_parse_markdown_tables():
+    tables = parse_markdown_tables(CAP_TABLE + "\nSome text\n\n| a | a |\n|---|---|\n| 1 | 2 |\n")
+    assert len(tables) == 2
+    assert list(tables[0].columns) == ['Stockholder', 'Common', 'Series A Preferred', '% Fully Diluted']
+    assert len(tables[0]) == 3
+    assert list(tables[1].columns) == ['a', 'a 2']
+
+
+def test_normalize_cap_table():
+    entries = normalize_cap_table('Acme', parse_markdown_tables(CAP_TABLE)[0])
+    assert entries[['holder', 'share_class', 'funding_round', 'shares']].values.tolist() == [
+        ['Founder', 'Common', 'Common', 6000000.0],
+        ['Fund I', 'Series A Preferred', 'Series A', 4000000.0],
+    ]
+    assert entries['pct_fully_diluted'].tolist() == [60.0, 40.0]
+
+
+def test_group_by_company_totals_latest_table_only():
+    later = CAP_TABLE.replace('6,000,000', '8,000,000').replace('4,000,000', '2,000,000')
+    entries = extract_cap_table_entries(pd.DataFrame({'Company': ['Acme', 'Acme'], 'Markdown Content': [CAP_TABLE, later]}))
+    assert sorted(entries['table'].unique()) == [0, 1]
+    store = CapTableStore(entries)
+    totals = store.query(group_by=['company'])
+    assert totals['pct_fully_diluted'].tolist() == [100.0]
+    assert totals['shares'].tolist() == [10000000.0]
+    founder = store.query(holder='founder', group_by=['holder'])
+    assert founder['pct_fully_diluted'].tolist() == [80.0]
+
+
+def test_query_filters():
+    store = CapTableStore(extract_cap_table_entries(pd.DataFrame({'Company': ['Acme'], 'Markdown Content': [CAP_TABLE]})))
+    assert store.query(funding_round='series a')['holder'].tolist() == ['Fund I']
+    assert store.query(holder='fund')['holder'].tolist() == ['Fund I']
+    assert store.query(company='nope').empty
+
+
+def normalized(markdown):
+    return normalize_cap_table('Acme', parse_markdown_tables(markdown)[0])
+
+
+def test_aggregate_columns_are_not_share_classes():
+    entries = normalized("""
+| Holder | Common | Series Seed Preferred | Outstanding Shares | Fully Diluted Shares |
+|---|---|---|---|---|
+| Founder | 3,000,000 | | 3,000,000 | 3,000,000 |
+| Seed Fund | | 1,000,000 | 1,000,000 | 1,000,000 |
+| Option Pool | | | | 2,000,000 |
+""")
+    assert entries[['holder', 'share_class']].values.tolist() == [['Founder', 'Common'], ['Seed Fund', 'Series Seed Preferred']]
+    assert entries['pct_fully_diluted'].tolist() == [75.0, 25.0]
+
+
+def test_long_form_tables_read_the_class_column():
+    entries = normalized("""
+| Shareholder | Share Class | Shares |
+|---|---|---|
+| Founder | Common Stock | 6,000,000 |
+| Fund I | Series A Preferred | 3,000,000 |
+| Fund I | Series Seed Preferred | 1,000,000 |
+""")
+    assert entries[['holder', 'share_class', 'funding_round']].values.tolist() == [
+        ['Founder', 'Common Stock', 'Common'],
+        ['Fund I', 'Series A Preferred', 'Series A'],
+        ['Fund I', 'Series Seed Preferred', 'Seed'],
+    ]
+    assert entries['pct_fully_diluted'].tolist() == [60.0, 30.0, 10.0]
+
+
+def test_total_row_is_the_denominator():
+    # Only the largest holders are listed; the Total row covers everyone
+    entries = normalized("""
+| Shareholder | Common | Series A Preferred |
+|---|---|---|
+| Founder | 4,000,000 | |
+| Fund I | | 4,000,000 |
+| **Total** | 10,000,000 | 5,000,000 |
+""")
+    assert entries['pct_fully_diluted'].round(2).tolist() == [26.67, 26.67]
+    long_form = normalized("""
+| Shareholder | Class | Shares |
+|---|---|---|
+| Founder | Common | 4,000,000 |
+| Total | | 16,000,000 |
+""")
+    assert long_form['pct_fully_diluted'].tolist() == [25.0]
+    fully_diluted = normalized("""
+| Shareholder | Common | Options | Total Outstanding | Total Fully Diluted |
+|---|---|---|---|---|
+| Founder | 4,000,000 | | 4,000,000 | 4,000,000 |
+| Total | 4,000,000 | 4,000,000 | 4,000,000 | 8,000,000 |
+""")
+    assert fully_diluted['pct_fully_diluted'].tolist() == [50.0]
@@ -0,0 +1,54 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from graph.compaction import compact_messages, message_tokens, split_turns
+
+
+def turn(n, chars=2000):
+    call = {'name': 'all_deals_repl', 'args': {'query': f'q{n}'}, 'id': f'call-{n}'}
+    return [
+        HumanMessage(f'question {n}', id=f'h{n}'),
+        AIMessage('', tool_calls=[call], id=f'a{n}'),
+        ToolMessage('x' * chars, tool_call_id=f'call-{n}', name='all_deals_repl', id=f't{n}'),
+        AIMessage(f'answer {n}', id=f'r{n}'),
+    ]
+
+
+def assert_paired(messages):
+    calls = {c['id'] for m in messages if isinstance(m, AIMessage) for c in m.tool_calls}
+    results = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    assert calls == results
+
+
+def test_older_tool_results_are_cut_and_cached():
+    messages = turn(1) + turn(2) + turn(3)
+    compacted, added = compact_messages(messages, {}, max_tokens=10_000, keep_turns=2, tool_chars=50)
+    assert list(added) == ['t1']
+    assert compacted[2].content.endswith('[1950 more chars of all_deals_repl output omitted]')
+    assert [m.content for m in compacted[4:]] == [m.content for m in messages[4:]]
+    assert messages[2].content == 'x' * 2000
+
+
+def test_budget_is_met_and_tool_calls_keep_their_results():
+    messages = turn(1) + turn(2) + turn(3) + turn(4, chars=200)
+    compacted, _ = compact_messages(messages, {}, max_tokens=300, keep_turns=2, tool_chars=50)
+    assert sum(message_tokens(m) for m in compacted) <= 300
+    assert_paired(compacted)
+    assert len(split_turns(compacted)) == 2
+
+
+def test_latest_tool_results_are_never_cut():
+    messages = turn(1) + turn(2)[:3]
+    compacted, added = compact_messages(messages, {}, max_tokens=10, keep_turns=2, tool_chars=50)
+    assert compacted[-1].content == 'x' * 2000
+    assert compacted[2].content.startswith('x' * 50 + ' ...')
+    assert added == {}
+
+
+def test_supervisor_budget_cuts_do_not_leak_into_a_specialists_recent_turns():
+    messages = turn(1) + turn(2) + turn(3)
+    # The supervisor's small budget cuts a recent tool result for its own call only
+    supervisor, cache = compact_messages(messages, {}, max_tokens=600, keep_turns=2, tool_chars=50)
+    assert any(m.id == 't2' and len(m.content) < 2000 for m in supervisor)
+    assert 't2' not in cache
+    specialist, _ = compact_messages(messages, cache, max_tokens=100_000, keep_turns=2, tool_chars=50)
+    assert next(m for m in specialist if m.id == 't2').content == 'x' * 2000
+    assert next(m for m in specialist if m.id == 't1').content == cache['t1']
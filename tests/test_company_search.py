@@ -0,0 +1,55 @@
+import pytest
+from langchain_core.documents import Document
+from data.loaders import build_indexes
+from tools.company_search import CompanySearch, format_results
+
+
+class NameOnlyVectorStore:
+    """Pinecone-style hits: metadata carries the company name but no company_id"""
+
+    def similarity_search_with_score(self, query, k=4, filter=None):
+        return [(Document(page_content='Remote monitoring', metadata={'Companies': 'ACME Health'}), 0.9),
+                (Document(page_content='ECG diagnostics', metadata={'Companies': 'Cardio AI Inc'}), 0.85)]
+
+
+def make_search(dataframes, **kwargs):
+    indexes = build_indexes(dataframes)
+    return CompanySearch(NameOnlyVectorStore(), dataframes['all_companies'], indexes['text']['all_companies'],
+                         entities=indexes['entities'], **kwargs)
+
+
+def test_vector_and_keyword_hits_fuse_by_company(dataframes):
+    results = make_search(dataframes).search('cardiology monitoring')
+    keys = [make_search(dataframes).key(doc) for doc, _ in results]
+    assert len(keys) == len(set(keys))
+    assert keys[0] == 'acme-health'
+    assert dict(zip(keys, (score for _, score in results)))['acme-health'] == 0.9
+
+
+def test_format_results_labels_keyword_only_hits(dataframes):
+    results = make_search(dataframes).search('proteomics')
+    lines = format_results(results).splitlines()
+    assert lines[0] == 'name | vertical | score | description'
+    assert any(line.startswith('BetaBio LLC | Therapeutics | keyword |') for line in lines)
+    assert any(' | 0.90 | ' in line for line in lines)
+
+
+def test_cutoff_keeps_between_min_k_and_k(dataframes):
+    search = make_search(dataframes, k=3, min_k=2, score_cutoff=0.9)
+    hits = [(Document(page_content=str(i)), score) for i, score in enumerate([1.0, 0.95, 0.5, 0.4])]
+    assert [doc.page_content for doc, _ in search.cutoff(hits)] == ['0', '1']
+    assert len(search.cutoff([(doc, 1.0) for doc, _ in hits])) == 3
+
+
+def test_date_filters(dataframes):
+    search = make_search(dataframes)
+    metadata_filter, mask = search.build_filter(received_after='2024-01-01', received_before='2024-06-30')
+    assert mask.tolist() == [False, False, True, False]
+    assert metadata_filter == {'date_received_ts': {'$gte': 1704067200, '$lte': 1719705600}}
+    assert search.build_filter() == (None, None)
+
+
+def test_invalid_date_is_a_tool_error(dataframes):
+    search = make_search(dataframes)
+    with pytest.raises(ValueError, match="received_after must be a date like YYYY-MM-DD, got 'last spring'"):
+        search.build_filter(received_after='last spring')
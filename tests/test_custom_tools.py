@@ -0,0 +1,8 @@
+from data.loaders import build_indexes
+from tools.custom_tools import create_custom_tools
+
+
+def test_company_search_without_vectorstore_reports_error(dataframes):
+    tools = create_custom_tools(dataframes, None, build_indexes(dataframes))
+    assert tools['search_companies'].invoke({'query': 'cardiology'}).startswith("Error: company search is unavailable")
+    assert tools['search_companies_batch'].invoke({'queries': ['ecg']}).startswith("Error: company search is unavailable")
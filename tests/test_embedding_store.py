@@ -0,0 +1,30 @@
+import os
+import numpy as np
+from data.embedding_store import EmbeddingStore, quantize
+from data.vector_index import normalize_rows
+
+
+def test_quantize_round_trip():
+    vectors = normalize_rows(np.random.default_rng(0).normal(size=(50, 16)))
+    codes, scales = quantize(vectors)
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    np.testing.assert_allclose(codes * scales[:, None], vectors, atol=np.abs(vectors).max() / 127)
+
+
+def test_store_is_smaller_than_float32_and_ranks_exactly(tmp_path):
+    vectors = normalize_rows(np.random.default_rng(0).normal(size=(2000, 64)))
+    store = EmbeddingStore.write(str(tmp_path), vectors, 'fp')
+    on_disk = sum(os.path.getsize(tmp_path / name) for name in ('codes.npy', 'scales.npy', 'vectors.npy'))
+    assert on_disk < 0.8 * vectors.nbytes
+
+    reopened = EmbeddingStore.open(str(tmp_path))
+    assert reopened.fingerprint == 'fp' and len(reopened) == 2000
+    query = vectors[7] + 0.05
+    positions, scores = reopened.top_k(query, np.arange(2000), 10)
+    exact = vectors @ query
+    assert list(positions) == list(np.argsort(-exact)[:10])
+    np.testing.assert_allclose(scores, exact[positions], atol=1e-3)
+
+
+def test_open_missing_store(tmp_path):
+    assert EmbeddingStore.open(str(tmp_path / 'none')) is None
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import pytest
+from data.embeddings import CachedEmbeddings
+
+
+def test_cache_hits_memory_then_disk(tmp_path, embeddings):
+    path = str(tmp_path / 'embeddings.sqlite')
+    cache = CachedEmbeddings(embeddings, model='m', path=path, max_size=2)
+    first = cache.embed_documents(['Cardiology AI', 'proteomics', 'cardiology  ai'])
+    assert embeddings.calls == 1
+    assert first[0] == first[2]
+    assert cache.embed_query('PROTEOMICS') == first[1]
+    assert embeddings.calls == 1
+
+    # A new process (empty LRU) reads the SQLite store; another model never shares entries
+    reopened = CachedEmbeddings(embeddings, model='m', path=path)
+    assert reopened.embed_query('cardiology ai') == pytest.approx(first[0])
+    assert embeddings.calls == 1
+    CachedEmbeddings(embeddings, model='other', path=path).embed_query('cardiology ai')
+    assert embeddings.calls == 2
+
+
+def test_lru_is_bounded(embeddings):
+    cache = CachedEmbeddings(embeddings, model='m', max_size=2)
+    cache.embed_documents(['a', 'b', 'c'])
+    assert len(cache.lru) == 2
+    cache.embed_query('a')
+    assert embeddings.calls == 2
+
+
+def test_async_paths_share_the_cache(tmp_path, embeddings):
+    cache = CachedEmbeddings(embeddings, model='m', path=str(tmp_path / 'e.sqlite'))
+    vectors = asyncio.run(cache.aembed_documents(['x', 'y']))
+    assert asyncio.run(cache.aembed_query('x')) == vectors[0] == cache.embed_query('X')
+
+
+def test_async_cache_io_runs_off_the_event_loop(monkeypatch, embeddings):
+    cache = CachedEmbeddings(embeddings, model='m')
+    threads = []
+    lookup, store = cache.lookup, cache.store
+    monkeypatch.setattr(cache, 'lookup', lambda keys: threads.append(threading.get_ident()) or lookup(keys))
+    monkeypatch.setattr(cache, 'store', lambda vectors: threads.append(threading.get_ident()) or store(vectors))
+
+    async def embed():
+        loop_thread = threading.get_ident()
+        await cache.aembed_query('x')
+        await cache.aembed_documents(['x', 'y'])
+        return loop_thread
+
+    loop_thread = asyncio.run(embed())
+    assert len(threads) == 4 and loop_thread not in threads
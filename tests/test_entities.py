@@ -0,0 +1,56 @@
+import pandas as pd
+from data.entities import EntityIndex, build_entity_index, normalize_company_name, split_meeting_companies
+
+
+def make_dataframes():
+    return {
+        'all_companies': pd.DataFrame({'Companies': ['Acme Health, Inc.', 'Beta Therapeutics', 'Gamma Bio']}),
+        'all_deals': pd.DataFrame({'Company': ['ACME Health', 'Beta Therapeutic LLC', None]}),
+        'meetings_df': pd.DataFrame({'companies': ["Acme Health', 'Gamma Bio", None]}),
+    }
+
+
+def test_normalize_company_name():
+    assert normalize_company_name('Acme Health, Inc.') == 'acme health'
+    assert normalize_company_name('Société Générale SA') == 'societe generale'
+    assert normalize_company_name('AT&T') == 'at and t'
+    assert normalize_company_name('Inc') == 'inc'
+
+
+def test_split_meeting_companies():
+    assert split_meeting_companies("Acme', 'Beta") == ['Acme', 'Beta']
+    assert split_meeting_companies(None) == []
+
+
+def test_spellings_merge_into_one_entity():
+    index = EntityIndex().fit(make_dataframes())
+    acme = index.company_id('ACME Health')
+    assert acme == index.company_id('Acme Health, Inc.') == 'acme-health'
+    assert index.company_id('Beta Therapeutic LLC') == index.company_id('Beta Therapeutics')
+    assert index.entities[acme]['rows'] == {'all_companies': 1, 'all_deals': 1, 'meetings_df': 1}
+    assert index.company_id('Gamma Bio') != acme
+
+
+def test_resolve():
+    index = EntityIndex().fit(make_dataframes())
+    assert index.resolve('acme health inc') == [('acme-health', 100)]
+    assert index.resolve('Acme Helth')[0][0] == 'acme-health'
+    assert index.resolve('Zzyzx Quantum') == []
+
+
+def test_names_with_only_common_trigrams_still_merge():
+    # Every trigram of the names below is shared by more than max_block_size keys
+    names = ['Health Therapeutics', 'Health Therapeutic', 'Healthe Therapeutics', 'Health Therapeutix']
+    index = EntityIndex(max_block_size=1).fit({'all_companies': pd.DataFrame({'Companies': names})})
+    assert len({index.company_id(name) for name in names}) == 1
+    assert index.resolve('Health Therapeutica')[0][0] == index.company_id(names[0])
+
+
+def test_assign_replaces_frames_with_tagged_copies():
+    source = pd.DataFrame({'Company': ['Acme Health', 'Gamma Bio'], 'other': [1, 2]})
+    dataframes = make_dataframes()
+    dataframes['all_deals'] = source[['Company']]
+    build_entity_index(dataframes)
+    assert 'company_id' not in source.columns
+    assert dataframes['all_deals']['company_id'].tolist() == ['acme-health', 'gamma-bio']
+    assert dataframes['meetings_df']['company_ids'].tolist() == [['acme-health', 'gamma-bio'], []]
@@ -0,0 +1,16 @@
+from langchain_core.messages import AIMessage
+from langgraph.graph import END
+from graph.builder import route_to_specialist
+from graph.events import emit
+
+
+def test_route_event_reports_end_when_supervisor_answers():
+    events = []
+    emit("route", writer=events.append, specialist=route_to_specialist({"messages": [AIMessage("Here you go.")]}))
+    emit("route", writer=events.append, specialist=route_to_specialist({"messages": [AIMessage("Routing to Deals Specialist")]}))
+    assert events == [{"event": "route", "specialist": END}, {"event": "route", "specialist": "deals"}]
+    assert END == "__end__"
+
+
+def test_emit_outside_a_run_is_a_noop():
+    emit("route", specialist="deals")
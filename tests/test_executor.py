@@ -0,0 +1,82 @@
+import asyncio
+import time
+import pandas as pd
+from langchain_core.messages import AIMessage
+from tools.executor import ParallelToolNode, create_tool_executor
+from tools.repl import ConcurrentPythonREPLTool
+
+
+def make_node():
+    repl = ConcurrentPythonREPLTool(locals={'df': pd.DataFrame({'a': [1, 2, 3]})}, name='df_repl')
+    other = ConcurrentPythonREPLTool(locals={}, name='other_repl')
+    tools = {'df_repl': repl, 'other_repl': other}
+    return ParallelToolNode(list(tools.values()), create_tool_executor()), repl
+
+
+def calls(*queries):
+    return {"messages": [AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"query": query}, "id": f"c{i}"} for i, (name, query) in enumerate(queries)
+    ])]}
+
+
+def test_repl_calls_keep_state_and_their_own_output():
+    node, repl = make_node()
+    node(calls(('df_repl', 'total = df.a.sum()')), {})
+    result = node(calls(*[('df_repl', f'print(total + {i})') for i in range(8)], ('other_repl', 'print("other")')), {})
+    assert [m.content for m in result["messages"]] == [f"{6 + i}\n" for i in range(8)] + ["other\n"]
+    assert [m.tool_call_id for m in result["messages"]] == [f"c{i}" for i in range(9)]
+
+
+def test_async_calls_and_unknown_tools():
+    node, _ = make_node()
+    result = asyncio.run(node.acall(calls(('df_repl', 'df.a.max()'), ('missing', 'x')), {}))
+    assert result["messages"][0].content == '3'
+    assert result["messages"][1].content.startswith("Error: missing is not a valid tool")
+
+
+def slow_node(max_seconds):
+    tools = {'df_repl': ConcurrentPythonREPLTool(locals={'time': time}, name='df_repl')}
+    return ParallelToolNode(list(tools.values()), create_tool_executor(), max_seconds)
+
+
+def test_calls_past_the_agents_time_limit_return_an_error():
+    node = slow_node(max_seconds=5)
+    state = {**calls(('df_repl', 'time.sleep(2)')), "started_at": time.time() - 4.8}
+    started = time.perf_counter()
+    result = node(state, {})
+    assert time.perf_counter() - started < 1
+    assert "did not finish within the agent's 5s time limit" in result["messages"][0].content
+
+    started = time.perf_counter()
+    result = asyncio.run(node.acall(state, {}))
+    assert time.perf_counter() - started < 1
+    assert result["messages"][0].content.startswith("Error: df_repl did not finish")
+
+
+def test_fast_calls_and_unbounded_nodes_are_not_cut():
+    assert slow_node(max_seconds=5)({**calls(('df_repl', '1 + 1')), "started_at": time.time()}, {})["messages"][0].content == '2'
+    assert slow_node(max_seconds=None)(calls(('df_repl', 'time.sleep(0.2)')), {})["messages"][0].content == ''
+
+
+def test_repl_calls_run_concurrently_with_their_own_output():
+    repl = ConcurrentPythonREPLTool(locals={'time': time}, name='df_repl')
+    node = ParallelToolNode([repl], create_tool_executor())
+    started = time.perf_counter()
+    result = node(calls(*[('df_repl', f'time.sleep(0.3)\nprint({i})') for i in range(4)]), {})
+    assert time.perf_counter() - started < 0.9
+    assert [m.content for m in result["messages"]] == [f"{i}\n" for i in range(4)]
+
+
+def test_abandoned_repl_call_does_not_block_later_ones():
+    node = slow_node(max_seconds=1)
+    node({**calls(('df_repl', 'time.sleep(2)')), "started_at": time.time() - 0.9}, {})
+    started = time.perf_counter()
+    assert node({**calls(('df_repl', 'print("next")')), "started_at": time.time()}, {})["messages"][0].content == "next\n"
+    assert time.perf_counter() - started < 0.5
+
+
+def test_repl_statements_and_errors():
+    repl = ConcurrentPythonREPLTool(locals={})
+    assert repl.invoke('x = 2\nprint(x)\nx * 3') == 6
+    assert repl.invoke('y = x + 1') == ''
+    assert repl.invoke('1 / 0') == 'ZeroDivisionError: division by zero'
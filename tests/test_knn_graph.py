@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import pandas as pd
+from data.knn_graph import KNNGraph, build_similarity_graph, load_similarity_graph
+from data.loaders import build_indexes
+from data.vector_index import normalize_rows
+from tools.custom_tools import create_custom_tools
+
+
+def test_fit_matches_brute_force_with_small_blocks():
+    vectors = np.random.default_rng(0).normal(size=(300, 16))
+    graph = KNNGraph(k=5, max_block_mb=0).fit(vectors, np.arange(1000, 1300))
+    similarities = normalize_rows(vectors) @ normalize_rows(vectors).T
+    np.fill_diagonal(similarities, -np.inf)
+    for position in (0, 150, 299):
+        expected = np.argsort(-similarities[position])[:5]
+        neighbours = graph.neighbours(1000 + position, 5)
+        assert [row_id - 1000 for row_id, _ in neighbours] == list(expected)
+        np.testing.assert_allclose([score for _, score in neighbours], similarities[position, expected], atol=1e-2)
+
+
+def test_save_load_and_staleness(tmp_path, dataframes, embeddings):
+    path = str(tmp_path / 'knn.npz')
+    built = build_similarity_graph(dataframes['all_companies'], embeddings, path, k=2)
+    assert embeddings.calls == 1 and 0 in built
+    loaded = load_similarity_graph(dataframes['all_companies'], path, k=2)
+    assert loaded.neighbours(0) == built.neighbours(0)
+
+    dataframes['all_companies'].loc[0, 'Description'] = 'Changed'
+    with pytest.warns(UserWarning, match='missing or stale'):
+        assert 0 not in load_similarity_graph(dataframes['all_companies'], path, k=2)
+
+
+def test_similar_companies_requires_a_confident_match(tmp_path, dataframes, embeddings):
+    path = str(tmp_path / 'knn.npz')
+    build_similarity_graph(dataframes['all_companies'], embeddings, path, k=3)
+    indexes = build_indexes(dataframes, knn_graph_path=path, knn_graph_k=3)
+    similar = create_custom_tools(dataframes, None, indexes)['similar_companies']
+    result = similar.invoke({'company': 'acme health inc', 'k': 2})
+    assert result.startswith('Companies most similar to Acme Health:')
+    assert len(result.splitlines()) == 4 and 'Acme Health, Inc. |' not in result
+    assert similar.invoke({'company': 'Acme Wealth Partners'}).startswith("No company matches 'Acme Wealth Partners' closely enough.")
+
+
+def test_shifted_rows_make_the_graph_stale(tmp_path, dataframes, embeddings):
+    path = str(tmp_path / 'knn.npz')
+    companies = dataframes['all_companies']
+    build_similarity_graph(companies, embeddings, path, k=2)
+    # A company without a description shifts every later row but leaves the texts unchanged
+    blank = pd.DataFrame({'Companies': ['Zeta Labs'], 'Description': [None]})
+    dataframes['all_companies'] = pd.concat([blank, companies], ignore_index=True)
+    with pytest.warns(UserWarning, match='missing or stale'):
+        indexes = build_indexes(dataframes, knn_graph_path=path, knn_graph_k=2)
+    similar = create_custom_tools(dataframes, None, indexes)['similar_companies']
+    assert similar.invoke({'company': 'Cardio AI'}).startswith('Similar company lookup is unavailable')
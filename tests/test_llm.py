@@ -0,0 +1,32 @@
+import asyncio
+import httpx
+from agents.llm import LoopLocalTransport, get_llm, http_async_client
+
+
+def test_async_pool_per_event_loop():
+    transport = LoopLocalTransport(httpx.Limits(max_connections=4))
+
+    async def pools():
+        return transport.pool(), transport.pool()
+
+    first, again = asyncio.run(pools())
+    second, _ = asyncio.run(pools())
+    assert first is again
+    assert second is not first
+
+
+def test_requests_go_through_the_running_loops_pool():
+    transport = LoopLocalTransport(httpx.Limits())
+    handler = httpx.MockTransport(lambda request: httpx.Response(200, text=request.url.path))
+    client = httpx.AsyncClient(transport=transport)
+
+    async def fetch():
+        transport.pools[asyncio.get_running_loop()] = handler
+        return (await client.get('http://api.test/ok')).text
+
+    assert asyncio.run(fetch()) == asyncio.run(fetch()) == '/ok'
+
+
+def test_models_share_one_client():
+    assert get_llm('gpt-4o', 0, 'sk-a') is get_llm('gpt-4o', 0, 'sk-a')
+    assert get_llm('gpt-4o', 0, 'sk-a').http_async_client is get_llm('gpt-4o', 0, 'sk-b').http_async_client is http_async_client()
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from langchain_core.embeddings import Embeddings
+from data.passages import PASSAGE_COLUMNS, PassageIndex, build_meeting_passages, build_passage_index, split_passages
+
+
+def test_split_packs_paragraphs_and_splits_long_ones():
+    text = "Short intro.\n\nSecond paragraph.\n\n" + " ".join(f"Sentence number {i} is here." for i in range(20))
+    passages = split_passages(text, max_chars=100)
+    assert passages[0].startswith("Short intro. Second paragraph. Sentence number 0")
+    assert all(len(p) <= 100 for p in passages)
+    assert " ".join(passages).split() == text.split()
+    assert split_passages("x" * 250, max_chars=100) == ["x" * 100, "x" * 100, "x" * 50]
+    assert split_passages("  \n\n ") == []
+
+
+def test_passages_carry_their_meeting(dataframes):
+    passages = build_meeting_passages(dataframes['meetings_df'], max_chars=60)
+    assert list(passages.columns) == PASSAGE_COLUMNS
+    assert passages['meeting_id'].tolist() == [0, 0, 1, 2]
+    assert passages.loc[1, 'passage'] == 'Revenue grew 40%.'
+    assert passages.loc[1, 'title'] == 'Acme Board Q1'
+
+
+def test_filters_by_company_and_meeting_type(dataframes, embeddings):
+    index = build_passage_index(dataframes['meetings_df'], embeddings)
+    assert set(index.search('meeting', company='acme health')['meeting_id']) == {0, 1}
+    assert index.search('meeting', company='cardio ai')['meeting_id'].tolist() == [1]
+    assert index.search('meeting', meeting_type='lp')['meeting_id'].tolist() == [2]
+    assert index.search('meeting', company='Unknown Co').empty
+
+
+class TableEmbeddings(Embeddings):
+    """Fixed vectors per text, so the semantic ranking differs from the keyword one"""
+
+    vectors = {'pricing': [1.0, 0.0], 'reimbursement codes and pricing': [0.99, 0.1],
+               'pricing pricing pricing update': [0.0, 1.0], 'reimbursement and cost of care': [0.8, 0.6]}
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def test_keyword_and_vector_rankings_are_fused():
+    passages = pd.DataFrame({
+        'meeting_id': [0, 1, 2], 'title': ['', '', ''], 'date': ['2024-01-01'] * 3, 'companies': ['Acme'] * 3,
+        'types': ['MAM'] * 3,
+        'passage': ['reimbursement codes and pricing', 'pricing pricing pricing update', 'reimbursement and cost of care'],
+    })
+    keyword_only = PassageIndex().fit(passages).search('pricing', k=3)
+    assert keyword_only['meeting_id'].tolist() == [1, 0]
+    fused = PassageIndex(TableEmbeddings()).fit(passages).search('pricing', k=3)
+    # Keyword ranking [1, 0], vector ranking [0, 2, 1]: the passage both rank highly wins, vector-only hits still appear
+    assert fused['meeting_id'].tolist() == [0, 1, 2]
+    assert fused['score'].tolist() == pytest.approx([1 / 62 + 1 / 61, 1 / 61 + 1 / 63, 1 / 62])
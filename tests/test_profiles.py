@@ -0,0 +1,44 @@
+import pandas as pd
+from data.loaders import build_indexes
+from tools.custom_tools import create_custom_tools
+
+
+def profile_tool(dataframes):
+    return create_custom_tools(dataframes, None, build_indexes(dataframes))['get_company_profile']
+
+
+def sections(profile: str):
+    return [line.split(':')[0] for line in profile.splitlines() if not line.startswith('  ')]
+
+
+def test_profile_merges_every_dataset(dataframes):
+    profile = profile_tool(dataframes).invoke({'name': 'acme health inc'})
+    assert profile.splitlines()[:2] == ['Acme Health (acme-health)', 'aliases: Acme Health; Acme Health Inc; Acme Health, Inc.']
+    assert sections(profile)[2:] == ['company', 'sante_review', 'deals', 'latest_rounds', 'recent_meetings', 'cap_table']
+    assert '  - holder=Jane Founder; share_class=Common; funding_round=Common; shares=4000000.0; pct_fully_diluted=40.0' in profile
+    assert 'company_id' not in profile.split('\n', 1)[1]
+
+
+def test_sections_are_most_recent_first_and_capped(dataframes):
+    deals = pd.DataFrame({
+        'Companies': ['Acme Health'] * 7,
+        'Deal Size': [float(i) for i in range(7)],
+        'Deal Date': [f'202{i}-01-01' for i in range(7)],
+    })
+    dataframes['all_deals'] = pd.concat([dataframes['all_deals'], deals], ignore_index=True)
+    lines = profile_tool(dataframes).invoke({'name': 'Acme Health'}).splitlines()
+    deal_lines = lines[lines.index('deals:') + 1:lines.index('deals:') + 6]
+    assert [line.split('Deal Date=')[1] for line in deal_lines] == ['2026-01-01', '2025-01-01', '2024-01-01', '2023-02-01', '2023-01-01']
+    assert 'deals_total: 8' in lines
+    meetings = lines[lines.index('recent_meetings:') + 1:lines.index('recent_meetings:') + 3]
+    assert [line.split('title=')[1].split(';')[0] for line in meetings] == ['MAM Jan', 'Acme Board Q1']
+
+
+def test_missing_sections_are_left_out(dataframes):
+    tool = profile_tool(dataframes)
+    assert sections(tool.invoke({'name': 'DermaScan'})) == ['DermaScan GmbH (dermascan)', 'aliases', 'company', 'sante_review']
+    assert sections(tool.invoke({'name': 'betabio'}))[2:] == ['company', 'deals', 'exits']
+
+
+def test_unknown_company(dataframes):
+    assert profile_tool(dataframes).invoke({'name': 'Nope Corp'}).startswith("No company profile matches 'Nope Corp'.")
@@ -0,0 +1,33 @@
+import pandas as pd
+from data.schema_summary import dataset_version, schema_summary, summarize_dataframe
+
+
+def test_dataset_version_tracks_content_not_identity(dataframes):
+    companies = dataframes['all_companies']
+    version = dataset_version(companies)
+    assert dataset_version(companies.copy()) == version
+    edited = companies.copy()
+    edited.loc[0, 'Description'] = 'Something else entirely.'
+    assert dataset_version(edited) != version
+    assert dataset_version(companies.rename(columns={'Country': 'HQ'})) != version
+    assert dataset_version(companies.astype({'Country': 'category'})) != version
+
+
+def test_dataset_version_handles_list_cells():
+    df = pd.DataFrame({'companies': [['Acme Health'], ['Cardio AI', 'Acme Health']]})
+    assert dataset_version(df) != dataset_version(pd.DataFrame({'companies': [['Acme Health'], ['Cardio AI']]}))
+
+
+def test_schema_summary_is_cached_per_version(tmp_path, dataframes):
+    companies = dataframes['all_companies']
+    summary = schema_summary(companies, 'all_companies', cache_dir=str(tmp_path))
+    assert summary == summarize_dataframe(companies, 'all_companies')
+    assert len(list(tmp_path.iterdir())) == 1
+    schema_summary(companies.copy(), 'all_companies', cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_summary_fits_its_budget(dataframes):
+    summary = summarize_dataframe(dataframes['all_companies'], 'all_companies', max_tokens=40)
+    assert len(summary) // 4 + 1 <= 40
+    assert summary.startswith('all_companies: 4 rows x')
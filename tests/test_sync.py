@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+from data.sync import company_records, company_vector_id, sync_company_embeddings
+
+
+class MemoryIndex:
+    """Pinecone-style index holding vectors in a dict"""
+
+    def __init__(self, ids=()):
+        self.vectors = {vector_id: None for vector_id in ids}
+
+    def upsert(self, vectors, namespace=None):
+        self.vectors.update({vector['id']: vector for vector in vectors})
+
+    def delete(self, ids, namespace=None):
+        for vector_id in ids:
+            self.vectors.pop(vector_id, None)
+
+    def list(self, namespace=None):
+        ids = sorted(self.vectors)
+        for start in range(0, len(ids), 2):
+            yield ids[start:start + 2]
+
+
+def test_company_vector_id():
+    assert company_vector_id('Acme Health, Inc.') == 'acme-health'
+
+
+def test_records_skip_empty_text_and_duplicates(dataframes):
+    companies = dataframes['all_companies']
+    companies.loc[4] = companies.loc[0]
+    companies.loc[1, 'Description'] = ' '
+    assert [record[0] for record in company_records(companies)] == ['acme-health', 'cardio-ai', 'dermascan']
+
+
+def test_sync_is_incremental(tmp_path, dataframes, embeddings):
+    companies, index, path = dataframes['all_companies'], MemoryIndex(), str(tmp_path / 'sync.sqlite')
+    assert sync_company_embeddings(companies, embeddings, index, path, batch_size=2) == {'upserted': 4, 'deleted': 0, 'unchanged': 0}
+    assert sync_company_embeddings(companies, embeddings, index, path) == {'upserted': 0, 'deleted': 0, 'unchanged': 4}
+
+    companies.loc[0, 'Description'] = 'Now a cardiac imaging company.'
+    stats = sync_company_embeddings(companies.drop(index=3), embeddings, index, path)
+    assert stats == {'upserted': 1, 'deleted': 1, 'unchanged': 2}
+    assert sorted(index.vectors) == ['acme-health', 'betabio', 'cardio-ai']
+    assert index.vectors['acme-health']['metadata']['Description'] == 'Now a cardiac imaging company.'
+
+
+def test_first_sync_deletes_legacy_ids(tmp_path, dataframes, embeddings):
+    index = MemoryIndex(['0', '1', '2', 'acme-health'])
+    stats = sync_company_embeddings(dataframes['all_companies'], embeddings, index, str(tmp_path / 'sync.sqlite'))
+    assert stats['deleted'] == 3
+    assert sorted(index.vectors) == ['acme-health', 'betabio', 'cardio-ai', 'dermascan']
+
+    # Later runs trust the manifest unless asked to reconcile
+    index.vectors['stray'] = None
+    assert sync_company_embeddings(dataframes['all_companies'], embeddings, index, str(tmp_path / 'sync.sqlite'))['deleted'] == 0
+    assert sync_company_embeddings(dataframes['all_companies'], embeddings, index, str(tmp_path / 'sync.sqlite'), reconcile=True)['deleted'] == 1
+
+
+def test_inserted_rows_do_not_resync_the_others(tmp_path, dataframes, embeddings):
+    companies, index, path = dataframes['all_companies'], MemoryIndex(), str(tmp_path / 'sync.sqlite')
+    sync_company_embeddings(companies, embeddings, index, path)
+    new = pd.DataFrame({'Companies': ['Zeta Labs'], 'Description': ['Gene therapy for rare diseases.']})
+    stats = sync_company_embeddings(pd.concat([new, companies], ignore_index=True), embeddings, index, path)
+    assert stats == {'upserted': 1, 'deleted': 0, 'unchanged': 4}
+    metadata = index.vectors['cardio-ai']['metadata']
+    assert 'row_id' not in metadata and metadata['company_id'] == 'cardio-ai'
+
+
+def test_interrupted_first_run_still_reconciles(tmp_path, dataframes, embeddings):
+    class FailingAfterOneBatch:
+        calls = 0
+
+        def embed_documents(self, texts):
+            FailingAfterOneBatch.calls += 1
+            if FailingAfterOneBatch.calls > 1:
+                raise ConnectionError('embedding service unavailable')
+            return embeddings.embed_documents(texts)
+
+    index, path = MemoryIndex(['legacy-0', 'legacy-1']), str(tmp_path / 'sync.sqlite')
+    with pytest.raises(ConnectionError):
+        sync_company_embeddings(dataframes['all_companies'], FailingAfterOneBatch(), index, path, batch_size=2, max_concurrency=1)
+    stats = sync_company_embeddings(dataframes['all_companies'], embeddings, index, path, batch_size=2)
+    assert stats == {'upserted': 2, 'deleted': 2, 'unchanged': 2}
+    assert sorted(index.vectors) == ['acme-health', 'betabio', 'cardio-ai', 'dermascan']
+    # Once a reconciling pass has completed, the manifest is trusted
+    index.vectors['stray'] = None
+    assert sync_company_embeddings(dataframes['all_companies'], embeddings, index, path)['deleted'] == 0
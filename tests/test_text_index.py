@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from data.text_index import BM25Index, build_text_indexes, reciprocal_rank_fusion, tokenize
+
+DOCS = {
+    'a': 'AI-powered ECG diagnostics for hospitals',
+    'b': 'Remote patient monitoring for cardiology and ECG',
+    'c': 'Biomarker discovery using proteomics',
+    'd': 'ECG ECG ECG wearable',
+}
+
+
+@pytest.fixture
+def index():
+    return BM25Index().fit(DOCS.keys(), DOCS.values())
+
+
+def test_tokenize_keeps_compound_terms_and_drops_stopwords():
+    assert tokenize('AI-powered diagnostics in the U.S. and EU') == ['ai-powered', 'diagnostics', 'u.s', 'eu']
+
+
+def test_bm25_matches_the_okapi_formula(index):
+    n, df, k1, b = 4, 3, index.k1, index.b
+    idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+    avgdl = np.mean([len(tokenize(t)) for t in DOCS.values()])
+    expected = idf * 3 * (k1 + 1) / (3 + k1 * (1 - b + b * 4 / avgdl))
+    assert index.score('ecg')[3] == pytest.approx(expected, rel=1e-5)
+
+
+def test_search_ranks_by_term_frequency_and_rarity(index):
+    assert [row_id for row_id, _ in index.search('ecg')] == ['d', 'a', 'b']
+    assert index.search('proteomics ecg', k=1)[0][0] == 'c'
+    assert index.search('unknown term') == []
+    mask = np.array([True, True, True, False])
+    assert [row_id for row_id, _ in index.search('ecg', mask=mask)] == ['a', 'b']
+
+
+def test_snippet_centres_on_the_first_match(index):
+    assert index.snippet('c', 'proteomics', width=20) == '...sing proteomics'
+
+
+def test_build_text_indexes(dataframes):
+    indexes = build_text_indexes(dataframes)
+    assert len(indexes['meetings_df']) == len(dataframes['meetings_df'])
+    assert indexes['all_companies'].search('proteomics')[0][0] == 1
+    assert len(BM25Index()) == 0 and BM25Index().search('x') == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'a'], ['b']], k=60)
+    assert [row_id for row_id, _ in fused] == ['b', 'a', 'c']
+    assert dict(fused)['b'] == pytest.approx(1 / 62 + 2 / 61)
+    assert dict(fused)['c'] == pytest.approx(1 / 63)
+    assert reciprocal_rank_fusion([]) == []
@@ -0,0 +1,45 @@
+import logging
+from uuid import uuid4
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableLambda
+from agents.usage import PromptCacheReport, PromptCacheUsage
+
+
+def completion(input_tokens, cache_read):
+    message = AIMessage('ok', usage_metadata={
+        'input_tokens': input_tokens, 'output_tokens': 5, 'total_tokens': input_tokens + 5,
+        'input_token_details': {'cache_read': cache_read},
+    })
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+def call(usage, node, input_tokens, cache_read):
+    run_id = uuid4()
+    usage.on_chat_model_start({}, [[]], run_id=run_id, metadata={'langgraph_node': node})
+    usage.on_llm_end(completion(input_tokens, cache_read), run_id=run_id)
+
+
+def test_snapshot_splits_cached_tokens_per_node():
+    usage = PromptCacheUsage()
+    call(usage, 'supervisor', 2000, 1536)
+    call(usage, 'supervisor', 2100, 0)
+    call(usage, 'deals', 1000, 0)
+    snapshot = usage.snapshot()
+    assert snapshot['supervisor'] == {
+        'calls': 2, 'input_tokens': 4100, 'cached_tokens': 1536, 'uncached_tokens': 2564,
+        'cache_hit_rate': 1536 / 4100,
+    }
+    assert snapshot['deals']['cache_hit_rate'] == 0.0
+    assert usage.runs == {}
+
+
+def test_report_is_logged_when_a_top_level_run_ends(caplog):
+    usage = PromptCacheUsage()
+    call(usage, 'supervisor', 1000, 500)
+    graph = RunnableLambda(lambda x: RunnableLambda(lambda y: y).invoke(x))
+    with caplog.at_level(logging.INFO, logger='agents.usage'):
+        graph.invoke(1, config={'callbacks': [PromptCacheReport(usage)]})
+    assert [r.getMessage() for r in caplog.records] == [
+        'Prompt cache usage: supervisor: 1 calls, 1000 input tokens, 500 cached (50%)'
+    ]
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.embedding_store import EmbeddingStore
+from data.vector_index import IVFIndex, LocalVectorStore, build_local_vectorstore, metadata_mask, normalize_rows
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 32))
+    return (centers[rng.integers(0, 20, 3000)] + 0.3 * rng.normal(size=(3000, 32))).astype(np.float32)
+
+
+def exact_top(vectors, query, k):
+    scores = normalize_rows(vectors) @ normalize_rows(query)
+    return set(np.argsort(-scores)[:k])
+
+
+def test_ivf_recall_and_exact_scores(vectors):
+    index = IVFIndex(target_recall=0.9, exact_threshold=500).fit(vectors)
+    assert index.centroids is not None and 1 <= index.nprobe <= len(index.centroids)
+    queries = vectors[:50] + 0.1
+    recall = np.mean([len(exact_top(vectors, q, 10) & set(index.search(q, 10)[0])) / 10 for q in queries])
+    assert recall >= 0.85
+    positions, scores = index.search(queries[0], 5)
+    np.testing.assert_allclose(scores, normalize_rows(vectors)[positions] @ normalize_rows(queries[0]), rtol=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_ivf_mask_restricts_candidates(vectors):
+    index = IVFIndex(exact_threshold=500).fit(vectors)
+    mask = np.zeros(len(vectors), dtype=bool)
+    mask[::7] = True
+    positions, _ = index.search(vectors[3], 10, mask=mask)
+    assert len(positions) == 10 and mask[positions].all()
+    assert set(positions) == {np.flatnonzero(mask)[i] for i in exact_top(vectors[mask], vectors[3], 10)}
+
+
+def test_ivf_save_and_load_with_store(tmp_path, vectors):
+    index = IVFIndex(exact_threshold=500).fit(vectors)
+    store = EmbeddingStore.write(str(tmp_path), index.vectors, 'v1')
+    index.attach(store)
+    index.save(str(tmp_path / 'ivf.npz'), 'v1')
+    loaded, fingerprint = IVFIndex.load(str(tmp_path / 'ivf.npz'), EmbeddingStore.open(str(tmp_path)))
+    assert fingerprint == 'v1' and loaded.nprobe == index.nprobe
+    np.testing.assert_array_equal(loaded.search(vectors[0], 5)[0], index.search(vectors[0], 5)[0])
+
+
+def test_ivf_add_appends_to_lists(vectors):
+    index = IVFIndex(exact_threshold=500).fit(vectors[:2000])
+    positions = index.add(vectors[2000:2010])
+    assert list(positions) == list(range(2000, 2010))
+    assert sum(len(l) for l in index.lists) == 2010
+    assert index.search(vectors[2005], 1)[0][0] == 2005
+
+
+def test_metadata_mask():
+    frame = pd.DataFrame({'Vertical': ['A', 'B', 'A'], 'ts': [1, 5, None]})
+    assert metadata_mask(frame, None) is None
+    assert metadata_mask(frame, {'Vertical': 'A'}).tolist() == [True, False, True]
+    assert metadata_mask(frame, {'Vertical': {'$in': ['B']}, 'ts': {'$gte': 2}}).tolist() == [False, True, False]
+    assert metadata_mask(frame, {'$or': [{'ts': {'$lt': 2}}, {'Vertical': {'$ne': 'A'}}]}).tolist() == [True, True, False]
+    assert metadata_mask(frame, {'missing': 'x'}).tolist() == [False, False, False]
+
+
+def test_local_vectorstore_add_texts(tmp_path, dataframes, embeddings):
+    store = build_local_vectorstore(dataframes['all_companies'], embeddings, str(tmp_path / 'index'))
+    ids = store.add_texts(['Robotic surgery platform'], [{'Companies': 'RoboSurg'}])
+    doc, score = store.similarity_search_with_score('robotic surgery', k=1)[0]
+    assert doc.metadata == {'Companies': 'RoboSurg', 'row_id': ids[0]}
+    assert store.similarity_search('robotic surgery', k=1, filter={'Companies': 'Acme Health, Inc.'})[0].metadata['row_id'] == 0
+
+
+def test_from_texts(embeddings):
+    store = LocalVectorStore.from_texts(['ecg ai', 'proteomics'], embeddings, [{'n': 1}, {'n': 2}])
+    assert store.similarity_search('proteomics', k=1)[0].metadata['n'] == 2
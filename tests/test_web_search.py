@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+from langchain_core.tools import StructuredTool
+from tools.web_search import WebSearchCache, trim_results
+
+
+class FakeSearch:
+    """Search tool stand-in returning one result per query and counting upstream calls"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls, self.delay, self.fail = 0, delay, fail
+
+    def results(self, query):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError('search backend unavailable')
+        if query == 'rate limited':
+            return 'Error: rate limited'
+        return [
+            {'title': query, 'url': f'https://example.test/{query.replace(" ", "-")}', 'content': f'About {query}.'},
+            {'title': 'Shared', 'url': f'https://{"www." if self.calls % 2 else ""}shared.test/page/', 'content': 'Shared page.'},
+        ]
+
+    def run(self, query: str):
+        time.sleep(self.delay)
+        return self.results(query)
+
+    async def arun(self, query: str):
+        await asyncio.sleep(self.delay)
+        return self.results(query)
+
+    def tool(self):
+        return StructuredTool.from_function(func=self.run, coroutine=self.arun, name='web_search', description='search')
+
+PAGES = [
+    {'title': 'FDA clears AI ECG', 'url': 'https://a.test/ecg', 'content': 'FDA clearance for AI ECG.',
+     'raw_content': 'Cardio AI received FDA clearance for its ECG algorithm.\n\nThe company plans a Series B.'},
+    {'title': 'Unrelated', 'url': 'https://b.test/golf', 'content': 'Golf tournament results and ' + 'scores ' * 100,
+     'raw_content': 'Golf tournament results.'},
+]
+
+
+def test_trim_keeps_relevant_passages_and_every_citation():
+    trimmed = trim_results(PAGES, 'FDA clearance ECG', max_tokens=1000, passage_chars=60)
+    assert [(r['title'], r['url']) for r in trimmed] == [(p['title'], p['url']) for p in PAGES]
+    assert trimmed[0]['content'] == 'Cardio AI received FDA clearance for its ECG algorithm.'
+    assert 'raw_content' not in trimmed[0]
+    # Nothing relevant on the page: the search snippet, truncated, keeps the citation useful
+    assert trimmed[1]['content'].startswith('Golf tournament results and scores')
+    assert len(trimmed[1]['content']) <= 203
+
+
+def test_trim_falls_back_to_snippets_when_over_budget():
+    trimmed = trim_results(PAGES, 'FDA clearance ECG', max_tokens=1, passage_chars=60)
+    assert [r['content'] for r in trimmed][0] == 'FDA clearance for AI ECG.'
+    assert len(trimmed) == 2
+
+
+def test_trim_passes_errors_through():
+    assert trim_results('Error: rate limited', 'x') == 'Error: rate limited'
+
+
+def test_async_cache_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    cache = WebSearchCache(FakeSearch().tool(), path=str(tmp_path / 'web.sqlite'))
+    threads = []
+    lookup, store = cache.lookup, cache.store
+    monkeypatch.setattr(cache, 'lookup', lambda key: threads.append(threading.get_ident()) or lookup(key))
+    monkeypatch.setattr(cache, 'store', lambda key, results: threads.append(threading.get_ident()) or store(key, results))
+
+    async def search():
+        await cache.asearch('cardio ai')
+        await cache.asearch('cardio ai')
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(search())
+    assert len(threads) == 3 and loop_thread not in threads
+
+
+def test_results_expire_after_the_ttl():
+    search = FakeSearch()
+    cache = WebSearchCache(search.tool(), ttl=60)
+    cache.search('cardio ai')
+    cache.search('Cardio  AI')
+    assert search.calls == 1
+    cache.ttl = 0
+    cache.search('cardio ai')
+    assert search.calls == 2
+
+
+def test_results_persist_in_sqlite(tmp_path):
+    path = str(tmp_path / 'web.sqlite')
+    WebSearchCache(FakeSearch().tool(), path=path).search('cardio ai')
+    search = FakeSearch()
+    assert WebSearchCache(search.tool(), path=path).search('cardio ai')[0]['title'] == 'cardio ai'
+    assert search.calls == 0
+    assert WebSearchCache(search.tool(), path=path, ttl=0).search('cardio ai') and search.calls == 1
+
+
+def test_concurrent_identical_queries_make_one_upstream_call():
+    search = FakeSearch(delay=0.2)
+    cache = WebSearchCache(search.tool())
+    threads = [threading.Thread(target=cache.search, args=('cardio ai',)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert search.calls == 1
+
+    async def searches():
+        return await asyncio.gather(*(cache.asearch('dermascan') for _ in range(4)))
+
+    assert len({str(results) for results in asyncio.run(searches())}) == 1
+    assert search.calls == 2
+
+
+def test_failures_and_error_strings_are_not_cached():
+    search = FakeSearch(fail=True)
+    cache = WebSearchCache(search.tool())
+    try:
+        cache.search('cardio ai')
+    except ConnectionError:
+        pass
+    assert cache.lookup(cache.key('cardio ai')) is None and cache.in_flight == {}
+    search.fail = False
+    assert cache.search('cardio ai')[0]['title'] == 'cardio ai'
+    assert cache.search('rate limited') == 'Error: rate limited'
+    assert cache.lookup(cache.key('rate limited')) is None
+
+
+def test_batches_dedupe_queries_and_merge_urls():
+    search = FakeSearch()
+    cache = WebSearchCache(search.tool())
+    merged = cache.search_batch(['cardio ai', 'Cardio AI ', 'dermascan', ''])
+    assert search.calls == 2
+    assert [r['url'] for r in merged][0] == 'https://www.shared.test/page/'
+    assert merged[0]['queries'] == ['cardio ai', 'dermascan']
+    assert sorted(r['title'] for r in merged[1:]) == ['cardio ai', 'dermascan']
+    assert asyncio.run(cache.asearch_batch(['cardio ai', 'dermascan'])) == merged
+    assert search.calls == 2
+
+
+def test_batch_reports_errors_only_when_every_query_fails():
+    cache = WebSearchCache(FakeSearch(fail=True).tool())
+    assert cache.search_batch(['a', 'b']).splitlines() == [
+        "a: ConnectionError('search backend unavailable')", "b: ConnectionError('search backend unavailable')"
+    ]
+    assert [r['title'] for r in WebSearchCache(FakeSearch().tool()).search_batch(['rate limited', 'x'])] == ['x', 'Shared']
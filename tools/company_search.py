@@ -0,0 +1,187 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from langchain_core.documents import Document
+from data.entities import EntityIndex, normalize_company_name
+from data.text_index import BM25Index, reciprocal_rank_fusion
+from data.vector_index import company_metadata, DATE_RECEIVED_COLUMN, DATE_RECEIVED_KEY
+
+# Categorical filters accepted by the search tools -> all_companies column
+FILTER_COLUMNS = {'vertical': 'Vertical', 'country': 'Country'}
+
+
+def document_key(doc: Document, entities: Optional[EntityIndex] = None) -> str:
+    """Identity of the company behind a search hit, shared by vector and keyword results"""
+    metadata = doc.metadata
+    if metadata.get('company_id'):
+        return metadata['company_id']
+    name = metadata.get('Companies') or metadata.get('Company')
+    if not name:
+        return doc.page_content
+    # Pinecone hits carry only the name: map it to the canonical ID keyword hits use
+    company_id = entities.company_id(name) if entities is not None else None
+    return company_id or normalize_company_name(name)
+
+
+def parse_date(name: str, value: str) -> pd.Timestamp:
+    date = pd.to_datetime(value, errors='coerce')
+    if pd.isna(date):
+        raise ValueError(f"{name} must be a date like YYYY-MM-DD, got {value!r}")
+    return date
+
+
+class CompanySearch:
+    """Hybrid (BM25 + vector, fused with RRF) company search with filter push-down and a relative score cutoff"""
+
+    def __init__(self, vectorstore, all_companies: pd.DataFrame, keyword_index: BM25Index,
+                 k: int = 15, mode: str = 'hybrid', text_key: str = 'Description', max_workers: int = 4,
+                 min_k: int = 3, score_cutoff: float = 0.85, entities: Optional[EntityIndex] = None):
+        self.vectorstore = vectorstore
+        self.entities = entities
+        self.all_companies = all_companies
+        self.keyword_index = keyword_index
+        self.k = k
+        self.min_k = min_k
+        self.score_cutoff = score_cutoff
+        self.mode = mode
+        self.text_key = text_key
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="company-search")
+
+    def key(self, doc: Document) -> str:
+        return document_key(doc, self.entities)
+
+    def canonical_values(self, column: str, value: str) -> List[str]:
+        """Stored spellings matching a filter value: case-insensitive exact match, else substring"""
+        values = self.all_companies[column].dropna().astype(str).unique()
+        wanted = value.strip().lower()
+        exact = [v for v in values if v.lower() == wanted]
+        return exact or [v for v in values if wanted in v.lower()] or [value]
+
+    def build_filter(self, vertical: Optional[str] = None, country: Optional[str] = None,
+                     received_after: Optional[str] = None, received_before: Optional[str] = None) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """Metadata filter for the vector store and the equivalent all_companies row mask"""
+        df = self.all_companies
+        metadata_filter = {}
+        mask = np.ones(len(df), dtype=bool)
+        for name, value in (('vertical', vertical), ('country', country)):
+            column = FILTER_COLUMNS[name]
+            if value and column in df.columns:
+                values = self.canonical_values(column, value)
+                metadata_filter[column] = {'$in': values}
+                mask &= df[column].isin(values).to_numpy()
+        dates = {op: parse_date(name, value) for op, name, value in
+                 (('$gte', 'received_after', received_after), ('$lte', 'received_before', received_before)) if value}
+        if dates and DATE_RECEIVED_COLUMN in df.columns:
+            received = pd.to_datetime(df[DATE_RECEIVED_COLUMN], errors='coerce')
+            for op, date in dates.items():
+                mask &= (received >= date if op == '$gte' else received <= date).to_numpy()
+            metadata_filter[DATE_RECEIVED_KEY] = {op: int(date.timestamp()) for op, date in dates.items()}
+        if not metadata_filter:
+            return None, None
+        return metadata_filter, mask
+
+    def vector_search(self, query: str, k: int, metadata_filter: Optional[Dict] = None) -> List[Tuple[Document, float]]:
+        return self.vectorstore.similarity_search_with_score(query, k=k, filter=metadata_filter)
+
+    def vector_search_by_vector(self, embedding: List[float], k: int, metadata_filter: Optional[Dict] = None) -> List[Tuple[Document, float]]:
+        return self.vectorstore.similarity_search_by_vector_with_score(embedding, k=k, filter=metadata_filter)
+
+    def document(self, row_id) -> Document:
+        """A company's all_companies row as a search result document"""
+        row = self.all_companies.loc[row_id]
+        text = row.get(self.text_key)
+        return Document(page_content='' if pd.isna(text) else str(text), metadata=company_metadata(row_id, row))
+
+    def keyword_search(self, query: str, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[Document, float]]:
+        return [(self.document(row_id), score) for row_id, score in self.keyword_index.search(query, k=k, mask=mask)]
+
+    def fuse(self, rankings: List[List[Tuple[Document, float]]]) -> List[Tuple[Document, float]]:
+        docs: Dict[str, Document] = {}
+        for ranking in rankings:
+            for doc, _ in ranking:
+                docs.setdefault(self.key(doc), doc)
+        fused = reciprocal_rank_fusion([self.key(doc) for doc, _ in ranking] for ranking in rankings)
+        return [(docs[key], score) for key, score in fused]
+
+    def cutoff(self, hits: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        """Keep hits scoring at least score_cutoff x the best score, but no fewer than min_k and no more than k"""
+        if not hits or hits[0][1] <= 0:
+            return hits[:self.min_k]
+        kept = sum(score >= hits[0][1] * self.score_cutoff for _, score in hits)
+        return hits[:max(self.min_k, min(kept, self.k))]
+
+    def rank(self, query: str, vector_hits: List[Tuple[Document, float]], mask: Optional[np.ndarray]) -> List[Tuple[Document, Optional[float]]]:
+        """Fused ranking for one query, paired with each company's vector similarity (None for keyword-only hits)"""
+        vector_hits = self.cutoff(vector_hits)
+        similarity = {self.key(doc): score for doc, score in vector_hits}
+        rankings = [vector_hits]
+        if self.mode == 'hybrid':
+            rankings.append(self.cutoff(self.keyword_search(query, self.k, mask)))
+        return [(doc, similarity.get(self.key(doc))) for doc, _ in self.fuse(rankings)[:self.k]]
+
+    def search(self, query: str, **filters) -> List[Tuple[Document, Optional[float]]]:
+        metadata_filter, mask = self.build_filter(**filters)
+        return self.rank(query, self.vector_search(query, self.k, metadata_filter), mask)
+
+    async def asearch(self, query: str, **filters) -> List[Tuple[Document, Optional[float]]]:
+        metadata_filter, mask = self.build_filter(**filters)
+        hits = await self.vectorstore.asimilarity_search_with_score(query, k=self.k, filter=metadata_filter)
+        return self.rank(query, hits, mask)
+
+    def search_batch(self, queries: List[str], **filters) -> List[Tuple[Document, Optional[float]]]:
+        """Merged results for several queries, deduplicated by company; metadata['queries'] lists the queries that found each"""
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))
+        if not queries:
+            return []
+        metadata_filter, mask = self.build_filter(**filters)
+        vectors = self.vectorstore.embeddings.embed_documents(queries)
+        futures = [self.pool.submit(self.vector_search_by_vector, vector, self.k, metadata_filter) for vector in vectors]
+        return self.merge([(query, self.rank(query, future.result(), mask)) for query, future in zip(queries, futures)])
+
+    async def asearch_batch(self, queries: List[str], **filters) -> List[Tuple[Document, Optional[float]]]:
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))
+        if not queries:
+            return []
+        metadata_filter, mask = self.build_filter(**filters)
+        vectors = await self.vectorstore.embeddings.aembed_documents(queries)
+        hits = await asyncio.gather(*(
+            self.vectorstore.asimilarity_search_by_vector_with_score(vector, k=self.k, filter=metadata_filter) for vector in vectors
+        ))
+        return self.merge([(query, self.rank(query, query_hits, mask)) for query, query_hits in zip(queries, hits)])
+
+    def merge(self, rankings: List[Tuple[str, List[Tuple[Document, Optional[float]]]]]) -> List[Tuple[Document, Optional[float]]]:
+        """Fuse per-query rankings, recording in metadata['queries'] which queries found each company"""
+        provenance: Dict[str, List[str]] = {}
+        similarity: Dict[str, float] = {}
+        for query, hits in rankings:
+            for doc, score in hits:
+                key = self.key(doc)
+                provenance.setdefault(key, []).append(query)
+                if score is not None:
+                    similarity[key] = max(score, similarity.get(key, score))
+        merged = []
+        for doc, _ in self.fuse([hits for _, hits in rankings])[:self.k]:
+            key = self.key(doc)
+            doc = Document(page_content=doc.page_content, metadata={**doc.metadata, 'queries': provenance[key]})
+            merged.append((doc, similarity.get(key)))
+        return merged
+
+
+def format_results(results: List[Tuple[Document, Optional[float]]], description_chars: int = 200) -> str:
+    """One compact line per company: name | vertical | score | truncated description"""
+    if not results:
+        return "No matching companies found"
+    lines = ["name | vertical | score | description"]
+    for doc, similarity in results:
+        name = doc.metadata.get('Companies') or doc.metadata.get('Company') or 'Unknown'
+        score = f"{similarity:.2f}" if similarity is not None else "keyword"
+        description = ' '.join(doc.page_content.split())
+        if len(description) > description_chars:
+            description = description[:description_chars].rstrip() + '...'
+        line = f"{name} | {doc.metadata.get('Vertical', '')} | {score} | {description}"
+        if doc.metadata.get('queries'):
+            line += f" | queries: {', '.join(doc.metadata['queries'])}"
+        lines.append(line)
+    return '\n'.join(lines)
@@ -1,71 +1,266 @@
-from langchain_experimental.tools import PythonAstREPLTool
 from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from langchain_community.tools.tavily_search import TavilySearchResults
+from typing import List, Literal, Optional
+from data.profiles import format_profile
+from tools.company_search import CompanySearch, format_results
+from tools.repl import ConcurrentPythonREPLTool
+from tools.web_search import WebSearchCache, cached_search_tool, trim_results
+from config.settings import (
+    SEARCH_MODE, RETRIEVER_K, RETRIEVER_MIN_K, RETRIEVER_SCORE_CUTOFF, SEARCH_DESCRIPTION_CHARS,
+    WEB_CACHE_PATH, WEB_CACHE_TTL, WEB_CACHE_SIZE, WEB_SEARCH_CONCURRENCY, WEB_CONTEXT_TOKENS
+)
 
 # Schema for Python inputs
 class PythonInputs(BaseModel):
     query: str = Field(description="code snippet to run")
 
+# Schema for full-text search inputs
+class TextSearchInputs(BaseModel):
+    dataset: Literal["meetings_df", "all_companies", "cap_tables"] = Field(description="dataset to search, named as in the REPL")
+    query: str = Field(description="keywords to search for")
+    k: int = Field(default=10, description="number of ranked rows to return")
+
+# Schema for meeting passage retrieval inputs
+class PassageSearchInputs(BaseModel):
+    query: str = Field(description="what the discussion was about")
+    k: int = Field(default=5, description="number of passages to return")
+    company: Optional[str] = Field(default=None, description="only meetings that discussed this company")
+    meeting_type: Optional[str] = Field(default=None, description="only meetings of this type (MAM, Board Meeting, LP Meeting)")
+
+# Schema for structured cap table queries
+class CapTableQueryInputs(BaseModel):
+    company: Optional[str] = Field(default=None, description="company name (exact or partial)")
+    holder: Optional[str] = Field(default=None, description="shareholder name (exact or partial)")
+    funding_round: Optional[str] = Field(default=None, description="funding round, e.g. 'Seed', 'Series A', 'Common', 'Options'")
+    share_class: Optional[str] = Field(default=None, description="share class as written in the cap table, e.g. 'Series A Preferred'")
+    group_by: Optional[List[Literal["company", "holder", "funding_round", "share_class"]]] = Field(default=None, description="columns to total shares and ownership by, over each company's latest cap table")
+
+# Structured filters shared by the company search tools
+class CompanySearchFilters(BaseModel):
+    vertical: Optional[str] = Field(default=None, description="only companies in this Vertical, e.g. 'Digital Health'")
+    country: Optional[str] = Field(default=None, description="only companies in this Country, e.g. 'Germany'")
+    received_after: Optional[str] = Field(default=None, description="only companies received by Santé on or after this date (YYYY-MM-DD)")
+    received_before: Optional[str] = Field(default=None, description="only companies received by Santé on or before this date (YYYY-MM-DD)")
+
+class CompanySearchInputs(CompanySearchFilters):
+    query: str = Field(description="what the companies do")
+
+class CompanyBatchSearchInputs(CompanySearchFilters):
+    queries: List[str] = Field(description="several search queries for one topic")
+
+# Schema for similar company lookups
+class SimilarCompaniesInputs(BaseModel):
+    company: str = Field(description="company name (any spelling) or company_id")
+    k: int = Field(default=10, description="number of similar companies to return")
+
+# Schema for batched web research
+class WebSearchBatchInputs(BaseModel):
+    queries: List[str] = Field(description="several web search queries covering one topic")
+
+# REPL variable name -> text index name
+TEXT_SEARCH_DATASETS = {
+    "meetings_df": "meetings_df",
+    "all_companies": "all_companies",
+    "cap_tables": "cap_tables_df",
+}
+
 # Define your specialized tools here
-def create_custom_tools(dataframes, vectorstore):
-    all_companies_tool = PythonAstREPLTool(
+def create_custom_tools(dataframes, vectorstore, indexes):
+    all_companies_tool = ConcurrentPythonREPLTool(
         locals={"all_companies": dataframes['all_companies']},
         name="all_companies_repl",
         description="Access to all healthcare companies across all verticals",
         args_schema=PythonInputs,
     )
 
-    all_deals_tool = PythonAstREPLTool(
+    all_deals_tool = ConcurrentPythonREPLTool(
         locals={"all_deals": dataframes['all_deals']},
         name="all_deals_repl",
         description="Access to all healthcare deals across all verticals",
         args_schema=PythonInputs,
     )
 
-    funding_deals_tool = PythonAstREPLTool(
+    funding_deals_tool = ConcurrentPythonREPLTool(
         locals={"sante_seen_additional_funding_deals": dataframes['sante_seen_additional_funding_deals']},
         name="funding_deals_repl",
         description="Access to additional funding deals seen by Santé",
         args_schema=PythonInputs,
     )
 
-    sante_companies_tool = PythonAstREPLTool(
+    sante_companies_tool = ConcurrentPythonREPLTool(
         locals={"sante_seen_all_companies": dataframes['sante_seen_all_companies']},
         name="sante_companies_repl",
         description="Access to all companies reviewed by Santé",
         args_schema=PythonInputs,
     )
 
-    exit_deals_tool = PythonAstREPLTool(
+    exit_deals_tool = ConcurrentPythonREPLTool(
         locals={"sante_seen_exit_deals": dataframes['sante_seen_exit_deals']},
         name="exit_deals_repl",
         description="Access to exit deals seen by Santé",
         args_schema=PythonInputs,
     )
 
-    meetings_tool = PythonAstREPLTool(
+    meetings_tool = ConcurrentPythonREPLTool(
         locals={"meetings_df": dataframes['meetings_df']},
         name="meetings_repl",
         description="Access to Santé meetings data (MAM, board meetings, LP meetings)",
         args_schema=PythonInputs,
     )
 
-    cap_tables_tool = PythonAstREPLTool(
-        locals={"cap_tables": dataframes['cap_tables_df']},
+    cap_tables_tool = ConcurrentPythonREPLTool(
+        locals={"cap_tables": dataframes['cap_tables_df'], "cap_table_entries": dataframes['cap_table_entries']},
         name="cap_tables_repl",
         description="Access to Santé portfolio company cap tables",
         args_schema=PythonInputs,
     )
 
-    # Tavily Search Tool
-    tavily_search = TavilySearchResults(max_results=3)
+    # Tavily Search Tool (repeated queries are served from cache for WEB_CACHE_TTL). Full page
+    # text is fetched, then trimmed to the passages most relevant to the query
+    web_search_cache = WebSearchCache(
+        TavilySearchResults(max_results=3, include_raw_content=True), ttl=WEB_CACHE_TTL, path=WEB_CACHE_PATH,
+        max_size=WEB_CACHE_SIZE, max_concurrency=WEB_SEARCH_CONCURRENCY
+    )
+    tavily_search = cached_search_tool(web_search_cache, WEB_CONTEXT_TOKENS)
+
+    # I/O-bound tools below get both a sync function and a coroutine, for invoke and ainvoke
+    def web_search_batch(queries: List[str]):
+        """Search the web with several queries at once (e.g. different angles on one topic). Returns one merged list of results, deduplicated by URL and ranked across queries; each lists the queries that found it."""
+        return trim_results(web_search_cache.search_batch(queries), ' '.join(queries), WEB_CONTEXT_TOKENS)
+
+    async def aweb_search_batch(queries: List[str]):
+        return trim_results(await web_search_cache.asearch_batch(queries), ' '.join(queries), WEB_CONTEXT_TOKENS)
+
+    # Search Companies Tool (built once and reused across calls); needs a vector store
+    unavailable = "Error: company search is unavailable because no vector store is configured. Use search_text with dataset='all_companies' instead."
+    company_search = CompanySearch(
+        vectorstore, dataframes['all_companies'], indexes['text']['all_companies'],
+        k=RETRIEVER_K, mode=SEARCH_MODE, min_k=RETRIEVER_MIN_K, score_cutoff=RETRIEVER_SCORE_CUTOFF,
+        entities=indexes['entities']
+    )
+
+    def search_companies(query: str, vertical: Optional[str] = None, country: Optional[str] = None,
+                         received_after: Optional[str] = None, received_before: Optional[str] = None) -> str:
+        """Search for relevant companies by meaning and by exact terms (drug names, modalities, acronyms), optionally restricted by vertical, country or date received"""
+        if vectorstore is None:
+            return unavailable
+        results = company_search.search(
+            query, vertical=vertical, country=country, received_after=received_after, received_before=received_before)
+        return format_results(results, SEARCH_DESCRIPTION_CHARS)
+
+    async def asearch_companies(query: str, vertical: Optional[str] = None, country: Optional[str] = None,
+                                received_after: Optional[str] = None, received_before: Optional[str] = None) -> str:
+        if vectorstore is None:
+            return unavailable
+        results = await company_search.asearch(
+            query, vertical=vertical, country=country, received_after=received_after, received_before=received_before)
+        return format_results(results, SEARCH_DESCRIPTION_CHARS)
+
+    def search_companies_batch(queries: List[str], vertical: Optional[str] = None, country: Optional[str] = None,
+                               received_after: Optional[str] = None, received_before: Optional[str] = None) -> str:
+        """Search for companies with several queries at once (e.g. alternative keywords for one topic), with the same optional filters. Returns merged, deduplicated results; each lists the queries that found it."""
+        if vectorstore is None:
+            return unavailable
+        results = company_search.search_batch(
+            queries, vertical=vertical, country=country, received_after=received_after, received_before=received_before)
+        return format_results(results, SEARCH_DESCRIPTION_CHARS)
+
+    async def asearch_companies_batch(queries: List[str], vertical: Optional[str] = None, country: Optional[str] = None,
+                                      received_after: Optional[str] = None, received_before: Optional[str] = None) -> str:
+        if vectorstore is None:
+            return unavailable
+        results = await company_search.asearch_batch(
+            queries, vertical=vertical, country=country, received_after=received_after, received_before=received_before)
+        return format_results(results, SEARCH_DESCRIPTION_CHARS)
+
+    web_search_batch = StructuredTool.from_function(web_search_batch, coroutine=aweb_search_batch, args_schema=WebSearchBatchInputs)
+    search_companies = StructuredTool.from_function(search_companies, coroutine=asearch_companies, args_schema=CompanySearchInputs)
+    search_companies_batch = StructuredTool.from_function(
+        search_companies_batch, coroutine=asearch_companies_batch, args_schema=CompanyBatchSearchInputs)
+
+    # Similar companies tool (precomputed neighbour graph, no embedding call)
+    @tool(args_schema=SimilarCompaniesInputs)
+    def similar_companies(company: str, k: int = 10) -> str:
+        """Find the companies most similar to a given company by description, e.g. its competitors or peers. Instant lookup; use this instead of search_companies for "companies like X"."""
+        graph = indexes.get('similar_companies')
+        if graph is None or not graph.positions:
+            return "Similar company lookup is unavailable right now. Try search_companies with a description instead."
+        entities = indexes['entities']
+        matches = [(company, 100)] if company in entities.entities else entities.resolve(company, limit=3)
+        if not matches or matches[0][1] < entities.threshold:
+            closest = f" Closest: {', '.join(company_id for company_id, _ in matches)}." if matches else ""
+            return f"No company matches '{company}' closely enough.{closest} Confirm it with resolve_company, or use search_companies with a description."
+        company_id = matches[0][0]
+        all_companies = dataframes['all_companies']
+        rows = [row_id for row_id in all_companies.index[all_companies['company_id'] == company_id] if row_id in graph]
+        if not rows:
+            return f"{entities.entities[company_id]['name']} has no description on file. Try search_companies with a description instead."
+        neighbours = [
+            (row_id, score) for row_id, score in graph.neighbours(rows[0], k + len(rows))
+            if all_companies.at[row_id, 'company_id'] != company_id
+        ][:k]
+        header = f"Companies most similar to {entities.entities[company_id]['name']}:\n"
+        return header + format_results([(company_search.document(row_id), score) for row_id, score in neighbours], SEARCH_DESCRIPTION_CHARS)
+
+    # Full-text search tool
+    @tool(args_schema=TextSearchInputs)
+    def search_text(dataset: str, query: str, k: int = 10) -> str:
+        """Keyword search (BM25) over meeting notes, company keywords/descriptions or cap table content. Returns ranked row IDs (DataFrame index labels, usable with .loc) and snippets."""
+        index = indexes['text'][TEXT_SEARCH_DATASETS[dataset]]
+        hits = index.search(query, k=k)
+        if not hits:
+            return f"No rows in {dataset} match '{query}'"
+        return "\n".join(
+            f"{row_id} (score {score:.2f}): {index.snippet(row_id, query)}" for row_id, score in hits
+        )
+
+    # Meeting passage retrieval tool
+    @tool(args_schema=PassageSearchInputs)
+    def search_meeting_passages(query: str, k: int = 5, company: Optional[str] = None, meeting_type: Optional[str] = None) -> str:
+        """Retrieve the most relevant passages from meeting notes (not whole meetings), each labelled with its meeting's row ID, title, date, companies and type."""
+        passages = indexes['meeting_passages'].search(query, k=k, company=company, meeting_type=meeting_type)
+        if passages.empty:
+            return f"No meeting passages match '{query}'"
+        return "\n\n".join(
+            f"[meeting {p.meeting_id} | {p.title} | {p.date} | {p.companies} | {p.types}]\n{p.passage}"
+            for p in passages.itertuples()
+        )
+
+    # Structured cap table query tool
+    @tool(args_schema=CapTableQueryInputs)
+    def query_cap_tables(company: Optional[str] = None, holder: Optional[str] = None, funding_round: Optional[str] = None,
+                         share_class: Optional[str] = None, group_by: Optional[List[str]] = None) -> str:
+        """Look up parsed cap table positions (shares and % fully diluted per holder and share class), filtered by company, holder, funding round or share class, optionally totalled by group_by over each company's latest cap table."""
+        result = indexes['cap_tables'].query(company, holder, funding_round, share_class, group_by)
+        if result.empty:
+            return "No cap table entries match these filters"
+        return result.head(50).to_string(index=False, float_format=lambda x: f"{x:,.2f}")
+
+    # Company entity resolution tool
+    @tool
+    def resolve_company(name: str) -> str:
+        """Resolve any spelling of a company name to its canonical company_id, the spellings used in each dataset and how many rows each dataset has for it. Filter DataFrames with df['company_id'] == company_id (meetings_df: company_ids lists)."""
+        entities = indexes['entities']
+        matches = entities.resolve(name)
+        if not matches:
+            return f"No company matches '{name}'"
+        lines = []
+        for company_id, score in matches:
+            entity = entities.entities[company_id]
+            rows = ", ".join(f"{dataset}: {count}" for dataset, count in entity['rows'].items())
+            lines.append(f"{company_id} (match {score}) - {entity['name']}\n  spellings: {'; '.join(entity['aliases'])}\n  rows: {rows}")
+        return "\n".join(lines)
 
-    # Search Companies Tool
+    # Company profile tool
     @tool
-    def search_companies(query: str) -> str:
-        """Search for relevant companies in the vector database"""
-        return vectorstore.as_retriever(search_kwargs={"k": 15}).invoke(query)
+    def get_company_profile(name: str) -> str:
+        """Everything we hold on one company in a single lookup: company record, Santé review, recent deals, latest funding rounds, exits, recent meetings and cap table positions. Accepts any spelling or a company_id."""
+        profile = indexes['profiles'].get(name)
+        if profile is None:
+            return f"No company profile matches '{name}'. Try resolve_company to find the right spelling."
+        return format_profile(profile)
 
     return {
         'all_companies_tool': all_companies_tool,
@@ -76,5 +271,13 @@ def create_custom_tools(dataframes, vectorstore):
         'meetings_tool': meetings_tool,
         'cap_tables_tool': cap_tables_tool,
         'tavily_search': tavily_search,
+        'web_search_batch': web_search_batch,
         'search_companies': search_companies,
+        'search_companies_batch': search_companies_batch,
+        'similar_companies': similar_companies,
+        'search_text': search_text,
+        'search_meeting_passages': search_meeting_passages,
+        'query_cap_tables': query_cap_tables,
+        'resolve_company': resolve_company,
+        'get_company_profile': get_company_profile,
     } 
\ No newline at end of file
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from typing import Dict, List, Optional, Sequence
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+from graph.events import emit, stream_writer
+
+
+def tool_error(error: Exception) -> str:
+    return f"Error: {repr(error)}\n Please fix your mistakes."
+
+
+class ToolExecutor:
+    """Thread pool shared by every tool node (REPL tools capture their output per thread, see tools/repl.py)"""
+
+    def __init__(self, max_threads: int = 8):
+        self.threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="tools")
+
+    def shutdown(self) -> None:
+        self.threads.shutdown(wait=False, cancel_futures=True)
+
+
+class ParallelToolNode:
+    """Graph node running one AI message's tool calls concurrently, within what is left of the agent's time limit"""
+
+    def __init__(self, tools: Sequence[BaseTool], executor: ToolExecutor, max_seconds: Optional[float] = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.executor = executor
+        self.max_seconds = max_seconds
+
+    @property
+    def node(self) -> RunnableLambda:
+        """The node as a runnable with both sync and async implementations"""
+        return RunnableLambda(self.__call__, afunc=self.acall, name="tools")
+
+    @staticmethod
+    def _tool_calls(state) -> List[Dict]:
+        message = state["messages"][-1]
+        return message.tool_calls if isinstance(message, AIMessage) else []
+
+    def _remaining(self, state) -> Optional[float]:
+        """Seconds left of the agent's budget (started_at is set by the agent's first call), or None if unbounded"""
+        started_at = state.get("started_at")
+        if self.max_seconds is None or started_at is None:
+            return None
+        return max(0.0, started_at + self.max_seconds - time.time())
+
+    def _timed_out(self, call) -> str:
+        return (f"Error: {call['name']} did not finish within the agent's {self.max_seconds:g}s time limit. "
+                "Answer with what you have found so far.")
+
+    @staticmethod
+    def _messages(tool_calls, results) -> Dict[str, List[ToolMessage]]:
+        return {"messages": [
+            ToolMessage(content=result, name=call["name"], tool_call_id=call["id"])
+            for call, result in zip(tool_calls, results)
+        ]}
+
+    def __call__(self, state, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        tool_calls = self._tool_calls(state)
+        writer = stream_writer()
+        futures = {}
+        for i, call in enumerate(tool_calls):
+            started = self._started(writer, call)
+            futures[self.executor.threads.submit(self._run, call, config)] = (i, call, started)
+        # The stream writer only works from this thread, so report completions here as they happen
+        results = [None] * len(tool_calls)
+        try:
+            for future in as_completed(futures, timeout=self._remaining(state)):
+                i, call, started = futures[future]
+                results[i] = self._result(future)
+                self._finished(writer, call, started, results[i])
+        except FutureTimeout:
+            # Calls still running are abandoned (threads cannot be interrupted); queued ones never start
+            for future, (i, call, started) in futures.items():
+                if results[i] is None:
+                    future.cancel()
+                    results[i] = self._timed_out(call)
+                    self._finished(writer, call, started, results[i])
+        return self._messages(tool_calls, results)
+
+    async def acall(self, state, config: RunnableConfig) -> Dict[str, List[ToolMessage]]:
+        tool_calls = self._tool_calls(state)
+        writer = stream_writer()
+        loop = asyncio.get_running_loop()
+        timeout = self._remaining(state)
+        pending = []
+        for call in tool_calls:
+            tool = self.tools_by_name.get(call["name"])
+            if getattr(tool, "coroutine", None) is not None:
+                task = self._arun(tool, call, config)
+            else:
+                task = loop.run_in_executor(self.executor.threads, self._run, call, config)
+            pending.append(self._timed(writer, call, task, timeout))
+        results = await asyncio.gather(*pending)
+        return self._messages(tool_calls, results)
+
+    @staticmethod
+    def _started(writer, call) -> float:
+        emit("tool_start", writer, tool=call["name"], tool_call_id=call["id"])
+        return time.perf_counter()
+
+    @staticmethod
+    def _finished(writer, call, started: float, result: str) -> None:
+        emit("tool_end", writer, tool=call["name"], tool_call_id=call["id"],
+             elapsed_ms=round(1000 * (time.perf_counter() - started)), error=result.startswith("Error"))
+
+    async def _timed(self, writer, call, task, timeout: Optional[float] = None) -> str:
+        started = self._started(writer, call)
+        try:
+            result = await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            result = self._timed_out(call)
+        except Exception as e:
+            result = tool_error(e)
+        self._finished(writer, call, started, result)
+        return result
+
+    def _run(self, call, config: Optional[RunnableConfig] = None) -> str:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}]."
+        try:
+            return str(tool.invoke(call["args"], config))
+        except Exception as e:
+            return tool_error(e)
+
+    @staticmethod
+    async def _arun(tool: BaseTool, call, config: Optional[RunnableConfig] = None) -> str:
+        try:
+            return str(await tool.ainvoke(call["args"], config))
+        except Exception as e:
+            return tool_error(e)
+
+    @staticmethod
+    def _result(future) -> str:
+        try:
+            return future.result()
+        except Exception as e:
+            return tool_error(e)
+
+
+def create_tool_executor(max_threads: int = 8) -> ToolExecutor:
+    """Executor shared by every tool node in the graph"""
+    return ToolExecutor(max_threads)
@@ -0,0 +1,66 @@
+import ast
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_experimental.tools import PythonAstREPLTool
+from langchain_experimental.tools.python.tool import sanitize_input
+
+_capture = threading.local()
+_install_lock = threading.Lock()
+
+
+class ThreadLocalStdout(io.TextIOBase):
+    """sys.stdout stand-in writing to the current thread's capture buffer, if any, else to the real stdout"""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def target(self):
+        return getattr(_capture, 'buffer', None) or self.stdout
+
+    def write(self, text: str) -> int:
+        return self.target().write(text)
+
+    def flush(self) -> None:
+        self.target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stdout, name)
+
+
+@contextmanager
+def capture_stdout():
+    """Collect what this thread prints; other threads keep printing to their own targets"""
+    with _install_lock:
+        if not isinstance(sys.stdout, ThreadLocalStdout):
+            sys.stdout = ThreadLocalStdout(sys.stdout)
+    previous, _capture.buffer = getattr(_capture, 'buffer', None), io.StringIO()
+    try:
+        yield _capture.buffer
+    finally:
+        _capture.buffer = previous
+
+
+class ConcurrentPythonREPLTool(PythonAstREPLTool):
+    """PythonAstREPLTool with per-thread print capture, so calls on different threads can run at the same time"""
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        with capture_stdout() as output:
+            try:
+                if self.sanitize_input:
+                    query = sanitize_input(query)
+                tree = ast.parse(query)
+                exec(ast.unparse(ast.Module(tree.body[:-1], type_ignores=[])), self.globals, self.locals)
+                last = ast.unparse(ast.Module(tree.body[-1:], type_ignores=[]))
+                try:
+                    code = compile(last, '<repl>', 'eval')
+                except SyntaxError:
+                    exec(last, self.globals, self.locals)
+                    return output.getvalue()
+                result = eval(code, self.globals, self.locals)
+                return output.getvalue() if result is None else result
+            except Exception as e:
+                return "{}: {}".format(type(e).__name__, str(e))
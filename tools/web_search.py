@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+import numpy as np
+from langchain_core.tools import BaseTool, StructuredTool
+from data.embeddings import normalize_text
+from data.passages import split_passages
+from data.text_index import BM25Index, reciprocal_rank_fusion
+
+SearchResults = Union[List[Dict], str]
+
+
+class WebSearchCache:
+    """TTL cache with in-flight deduplication in front of a web search tool (in-process LRU plus SQLite on disk)"""
+
+    def __init__(self, search: BaseTool, ttl: float = 86400, path: Optional[str] = None, max_size: int = 256,
+                 max_concurrency: int = 4):
+        self.search_tool = search
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_concurrency = max_concurrency
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="web-search")
+        self.lru: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self.in_flight: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, created REAL, results TEXT)")
+            self.db.commit()
+
+    def key(self, query: str) -> str:
+        return hashlib.sha1(f"{getattr(self.search_tool, 'max_results', '')}\0{normalize_text(query)}".encode()).hexdigest()
+
+    def _fresh(self, created: float) -> bool:
+        return time.time() - created < self.ttl
+
+    def lookup(self, key: str) -> Optional[List[Dict]]:
+        with self.lock:
+            if key in self.lru:
+                created, results = self.lru[key]
+                if self._fresh(created):
+                    self.lru.move_to_end(key)
+                    return results
+                del self.lru[key]
+            if self.db is not None:
+                row = self.db.execute("SELECT created, results FROM searches WHERE key = ?", (key,)).fetchone()
+                if row and self._fresh(row[0]):
+                    results = json.loads(row[1])
+                    self._remember(key, row[0], results)
+                    return results
+        return None
+
+    def store(self, key: str, results: List[Dict]) -> None:
+        created = time.time()
+        with self.lock:
+            self._remember(key, created, results)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO searches (key, created, results) VALUES (?, ?, ?)",
+                                (key, created, json.dumps(results)))
+                self.db.commit()
+
+    def _remember(self, key: str, created: float, results: List[Dict]) -> None:
+        self.lru[key] = (created, results)
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_size:
+            self.lru.popitem(last=False)
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        """The in-flight future for key, and whether the caller owns it (must run the search)"""
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = self.in_flight[key] = Future()
+            return future, True
+
+    def _settle(self, key: str, future: Future, results: SearchResults = None, error: Optional[BaseException] = None) -> None:
+        """Publish the owner's outcome to waiting callers and release the key"""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                if isinstance(results, list):
+                    self.store(key, results)
+                future.set_result(results)
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def search(self, query: str) -> SearchResults:
+        key = self.key(query)
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+        future, owner = self._claim(key)
+        if not owner:
+            return future.result()
+        try:
+            results = self.search_tool.invoke({"query": query})
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, results)
+        return results
+
+    async def asearch(self, query: str) -> SearchResults:
+        key = self.key(query)
+        # SQLite reads and commits run off the event loop
+        cached = await asyncio.to_thread(self.lookup, key)
+        if cached is not None:
+            return cached
+        future, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            results = await self.search_tool.ainvoke({"query": query})
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        await asyncio.to_thread(self._settle, key, future, results)
+        return results
+
+    def search_batch(self, queries: List[str]) -> SearchResults:
+        """Merged results for several queries (see merge_web_results); an error string only if every query failed"""
+        queries = unique_queries(queries)
+        futures = [self.pool.submit(self.search, query) for query in queries]
+        rankings = []
+        for query, future in zip(queries, futures):
+            try:
+                rankings.append((query, future.result()))
+            except Exception as e:
+                rankings.append((query, repr(e)))
+        return merge_batch(rankings)
+
+    async def asearch_batch(self, queries: List[str]) -> SearchResults:
+        queries = unique_queries(queries)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(query):
+            async with semaphore:
+                return await self.asearch(query)
+
+        results = await asyncio.gather(*(bounded(query) for query in queries), return_exceptions=True)
+        return merge_batch([
+            (query, repr(result) if isinstance(result, BaseException) else result)
+            for query, result in zip(queries, results)
+        ])
+
+
+def unique_queries(queries: List[str]) -> List[str]:
+    """Non-empty queries, dropping repeats that normalize to the same cache key"""
+    unique: Dict[str, str] = {}
+    for query in queries:
+        if query.strip():
+            unique.setdefault(normalize_text(query), query)
+    return list(unique.values())
+
+
+def merge_batch(rankings: List[Tuple[str, SearchResults]]) -> SearchResults:
+    if rankings and not any(isinstance(results, list) for _, results in rankings):
+        return '\n'.join(f"{query}: {error}" for query, error in rankings)
+    return merge_web_results(rankings)
+
+
+def url_key(url: str) -> str:
+    """URL identity for deduplication: ignores scheme, www., fragment and trailing slash"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix('www.')
+    path = parts.path.rstrip('/')
+    return f"{host}{path}?{parts.query}" if parts.query else f"{host}{path}"
+
+
+def merge_web_results(rankings: List[Tuple[str, SearchResults]]) -> List[Dict]:
+    """Results across queries, deduplicated by URL and ranked by reciprocal-rank fusion, with the queries that found each"""
+    rankings = [(query, results) for query, results in rankings if isinstance(results, list)]
+    pages: Dict[str, Dict] = {}
+    provenance: Dict[str, List[str]] = {}
+    for query, results in rankings:
+        for result in results:
+            key = url_key(result.get('url', ''))
+            pages.setdefault(key, result)
+            provenance.setdefault(key, []).append(query)
+    fused = reciprocal_rank_fusion([url_key(result.get('url', '')) for result in results] for _, results in rankings)
+    return [{**pages[key], 'queries': provenance[key]} for key, _ in fused]
+
+
+def _snippet(text: str, chars: int) -> str:
+    text = ' '.join(str(text).split())
+    return text if len(text) <= chars else text[:chars].rstrip() + '...'
+
+
+def trim_results(results: SearchResults, query: str, max_tokens: int = 1500, passage_chars: int = 500,
+                 snippet_chars: int = 200) -> SearchResults:
+    """Each result cut to its passages most relevant to the query within max_tokens, else to a short snippet; none is dropped"""
+    if not isinstance(results, list):
+        return results
+    passages = [(i, passage) for i, result in enumerate(results)
+                for passage in split_passages(result.get('raw_content') or result.get('content') or '', passage_chars)]
+    if not passages:
+        return results
+    scores = BM25Index().fit(range(len(passages)), [passage for _, passage in passages]).score(query)
+    ranked = [p for p in np.argsort(-scores, kind='stable') if scores[p] > 0] or list(range(len(passages)))
+    kept, budget = set(), max_tokens * 4
+    for p in ranked:
+        if len(passages[p][1]) <= budget:
+            kept.add(p)
+            budget -= len(passages[p][1])
+    trimmed = []
+    for i, result in enumerate(results):
+        content = ' ... '.join(passage for p, (j, passage) in enumerate(passages) if j == i and p in kept)
+        page = {key: value for key, value in result.items() if key != 'raw_content'}
+        trimmed.append({**page, 'content': content or _snippet(result.get('content') or '', snippet_chars)})
+    return trimmed
+
+
+def cached_search_tool(cache: WebSearchCache, max_tokens: int = 1500) -> BaseTool:
+    """The cached, relevance-trimmed search as a tool with the wrapped tool's name, description and arguments"""
+    search = cache.search_tool
+
+    def run(query: str) -> SearchResults:
+        return trim_results(cache.search(query), query, max_tokens)
+
+    async def arun(query: str) -> SearchResults:
+        return trim_results(await cache.asearch(query), query, max_tokens)
+
+    return StructuredTool.from_function(
+        func=run, coroutine=arun, name=search.name, description=search.description, args_schema=search.args_schema,
+    )